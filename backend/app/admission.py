@@ -0,0 +1,271 @@
+# your_project/admission.py
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+from .dependencies import decode_token_cached
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Admission control in front of the routes. Each request takes a token from
+# token buckets keyed by client IP and, when it carries a valid bearer
+# token, by user (plus a stricter per-IP bucket for the bcrypt-bound login
+# and signup routes); an empty bucket answers 429 with Retry-After. Then
+# each route class has a cap on requests in flight; past it the request is
+# answered 503 at once instead of queueing behind the others, so a burst
+# from a few clients can't stretch everyone's latency.
+# Buckets are per process; set RATE_LIMIT_URL (e.g. redis://localhost:6379/0)
+# to share them between the workers on a host.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() in ("1", "true", "yes")
+RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL")
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "taskflow:ratelimit")
+# Buckets held in process; the least recently used (i.e. refilled) one is dropped first
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Sustained requests per second, and the burst allowed on top of it
+RATE_LIMIT_USER_RATE = float(os.getenv("RATE_LIMIT_USER_RATE", "20"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "40"))
+RATE_LIMIT_IP_RATE = float(os.getenv("RATE_LIMIT_IP_RATE", "50"))
+RATE_LIMIT_IP_BURST = float(os.getenv("RATE_LIMIT_IP_BURST", "100"))
+RATE_LIMIT_LOGIN_RATE = float(os.getenv("RATE_LIMIT_LOGIN_RATE", "0.5"))
+RATE_LIMIT_LOGIN_BURST = float(os.getenv("RATE_LIMIT_LOGIN_BURST", "10"))
+# Requests in flight per route class (0 = no cap)
+CONCURRENCY_LIMITS = {
+    "auth": int(os.getenv("CONCURRENCY_LIMIT_AUTH", str((os.cpu_count() or 1) * 4))),
+    "bulk": int(os.getenv("CONCURRENCY_LIMIT_BULK", "4")),
+    "write": int(os.getenv("CONCURRENCY_LIMIT_WRITE", "32")),
+    "read": int(os.getenv("CONCURRENCY_LIMIT_READ", "64")),
+}
+
+EXEMPT_PATHS = ("/metrics", "/docs", "/redoc", "/openapi.json")
+
+def route_class(method: str, path: str) -> Optional[str]:
+    # None: not capped (the event stream stays open for hours)
+    if method == "POST" and path in ("/token", "/users", "/users/"):
+        return "auth" # bcrypt
+    if path.startswith(("/tasks/export", "/tasks/import", "/tasks/bulk")):
+        return "bulk"
+    if path.startswith("/tasks/events"):
+        return None
+    return "read" if method in ("GET", "HEAD") else "write"
+
+class LocalBuckets:
+    """
+    Token buckets in this process: key -> (tokens, last refill).
+    """
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, limits: list) -> list:
+        """
+        limits: (key, rate, burst) per bucket. Takes a token from every bucket
+        only if none is empty; returns each bucket's wait (0 when it had a token).
+        """
+        now = time.monotonic()
+        with self._lock:
+            refilled = []
+            for key, rate, burst in limits:
+                tokens, updated = self._buckets.get(key, (burst, now))
+                refilled.append(min(burst, tokens + (now - updated) * rate))
+            waits = [0.0 if tokens >= 1 else (1 - tokens) / rate for tokens, (_, rate, _) in zip(refilled, limits)]
+            admitted = not any(waits)
+            for tokens, (key, _, _) in zip(refilled, limits):
+                self._buckets[key] = (tokens - 1 if admitted else tokens, now)
+                self._buckets.move_to_end(key)
+            # A dropped bucket comes back full: eviction only ever errs on the lenient side
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return waits
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "local", "keys": len(self._buckets)}
+
+# Same rule as LocalBuckets.take over all the request's buckets, applied
+# atomically on the server with its clock. ARGV holds rate, burst per key.
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local tokens, waits, admitted = {}, {}, true
+for i, key in ipairs(KEYS) do
+  local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'tokens', 'updated')
+  local updated = tonumber(state[2]) or now
+  tokens[i] = math.min(burst, (tonumber(state[1]) or burst) + (now - updated) * rate)
+  waits[i] = 0
+  if tokens[i] < 1 then
+    waits[i] = (1 - tokens[i]) / rate
+    admitted = false
+  end
+end
+for i, key in ipairs(KEYS) do
+  local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  if admitted then tokens[i] = tokens[i] - 1 end
+  redis.call('HSET', key, 'tokens', tokens[i], 'updated', now)
+  redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000))
+  waits[i] = tostring(waits[i])
+end
+return waits
+"""
+
+class RedisBuckets:
+    """
+    Token buckets in a Redis-compatible server shared by the workers.
+    Errors are logged and let the request through: the limiter never takes
+    the API down with it.
+    """
+    blocking = True
+
+    def __init__(self, url: str, prefix: str):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("RATE_LIMIT_URL is set but the 'redis' package is not installed.")
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+        self.errors = 0
+
+    def take(self, limits: list) -> list:
+        try:
+            waits = self._take(
+                keys=[f"{self.prefix}:{key}" for key, _, _ in limits],
+                args=[value for _, rate, burst in limits for value in (rate, burst)],
+            )
+            return [float(wait) for wait in waits]
+        except Exception:
+            self.errors += 1
+            logger.exception("Rate limit check failed")
+            return [0.0] * len(limits)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+def _bearer_email(scope) -> Optional[str]:
+    # Only verified tokens count, so a forged one can't drain someone else's bucket
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                return decode_token_cached(token).email
+            except Exception:
+                return None
+    return None
+
+class AdmissionControl:
+    def __init__(self, buckets, limits: dict):
+        self.buckets = buckets
+        self.limits = limits
+        self.in_flight = dict.fromkeys(limits, 0)
+        self.admitted = 0
+        self.rejected: dict = {}
+
+    def _reject(self, reason: str) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    async def check_rate(self, scope, klass: Optional[str]) -> float:
+        """
+        Take a token from every bucket the request falls under, or from none
+        of them if any is empty (a rejected request costs nothing). Returns 0,
+        or the longest wait among the empty ones.
+        """
+        client = scope.get("client")
+        # Behind a proxy, run uvicorn with --proxy-headers so this is the real client
+        ip = client[0] if client else "unknown"
+        checks = [("ip", ip, RATE_LIMIT_IP_RATE, RATE_LIMIT_IP_BURST)]
+        if klass == "auth":
+            checks.append(("login", ip, RATE_LIMIT_LOGIN_RATE, RATE_LIMIT_LOGIN_BURST))
+        email = _bearer_email(scope)
+        if email is not None:
+            checks.append(("user", email, RATE_LIMIT_USER_RATE, RATE_LIMIT_USER_BURST))
+        checks = [check for check in checks if check[2] > 0]
+        if not checks:
+            return 0.0
+        limits = [(f"{kind}:{key}", rate, burst) for kind, key, rate, burst in checks]
+        if self.buckets.blocking:
+            waits = await run_in_threadpool(self.buckets.take, limits)
+        else:
+            waits = self.buckets.take(limits)
+        for (kind, _, _, _), wait in zip(checks, waits):
+            if wait > 0:
+                self._reject(kind)
+        return max(waits)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ADMISSION_ENABLED,
+            "in_flight": dict(self.in_flight),
+            "limits": dict(self.limits),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            **self.buckets.stats(),
+        }
+
+admission = AdmissionControl(
+    RedisBuckets(RATE_LIMIT_URL, RATE_LIMIT_PREFIX) if RATE_LIMIT_URL else LocalBuckets(RATE_LIMIT_MAX_KEYS),
+    CONCURRENCY_LIMITS,
+)
+
+async def _send_error(send, status_code: int, detail: str, retry_after: int) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying `admission`: 429 when a rate limit is hit,
+    503 when the route class is at its concurrency cap. Both are answered
+    before any routing, authentication or database work. CORS preflights
+    and the metrics/docs endpoints are never limited.
+    """
+
+    def __init__(self, app, control: AdmissionControl = admission):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+        klass = route_class(scope["method"], scope["path"])
+
+        wait = await self.control.check_rate(scope, klass)
+        if wait > 0:
+            return await _send_error(send, 429, "Too many requests", max(1, math.ceil(wait)))
+
+        limit = self.control.limits.get(klass) if klass else None
+        if not limit:
+            self.control.admitted += 1
+            return await self.app(scope, receive, send)
+        # Runs on the event loop, so the counters need no lock
+        if self.control.in_flight[klass] >= limit:
+            self.control._reject(f"concurrency:{klass}")
+            return await _send_error(send, 503, "Server is busy, please retry shortly", 1)
+        self.control.in_flight[klass] += 1
+        self.control.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.in_flight[klass] -= 1
@@ -0,0 +1,84 @@
+# your_project/archive.py
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+
+from . import crud
+from .database import SessionLocal
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Background job moving tasks that have been completed for more than
+# ARCHIVE_AFTER_DAYS from `tasks` into `tasks_archive`. Each chunk of
+# ARCHIVE_BATCH_SIZE rows is its own short transaction, with a pause in
+# between so other writers get the lock. Also runnable from cron via
+# backend/archive_tasks.py.
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes")
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_PAUSE_SECONDS = float(os.getenv("ARCHIVE_PAUSE_SECONDS", "0.05"))
+
+def archive_completed(after_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                      pause: float = ARCHIVE_PAUSE_SECONDS, max_batches: Optional[int] = None) -> int:
+    """
+    Archive every eligible task, one chunk per transaction. Returns how many were moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=after_days)
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        with SessionLocal() as db:
+            # Also invalidates cached reads and notifies subscribers
+            moved = crud.archive_completed_tasks(db, cutoff, batch_size)
+        total += len(moved)
+        batches += 1
+        if len(moved) < batch_size:
+            break
+        time.sleep(pause)
+    return total
+
+class Archiver:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._runner: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.archived = 0
+        self.last_run_at: Optional[datetime] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Blocking DB work stays off the event loop
+                self.archived += await asyncio.to_thread(archive_completed)
+                self.runs += 1
+                self.last_run_at = datetime.utcnow()
+            except Exception:
+                logger.exception("Task archiving run failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._runner is not None,
+            "after_days": ARCHIVE_AFTER_DAYS,
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+archiver = Archiver(ARCHIVE_INTERVAL_SECONDS)
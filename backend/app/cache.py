@@ -0,0 +1,91 @@
+# your_project/cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with per-entry expiry.
+    Bounded by `maxsize` entries; the least recently used entry is evicted first.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# --- Authenticated-principal caches ---
+# Decoded bearer tokens (token -> TokenData) and the user they resolve to
+# (email -> UserInDB snapshot). Per process: other workers see changes once
+# their entries expire, so keep AUTH_CACHE_TTL short.
+AUTH_CACHE_MAXSIZE = int(os.getenv("AUTH_CACHE_MAXSIZE", "1024"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+token_cache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL)
+user_cache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL)
+
+def invalidate_user(email: Optional[str]) -> None:
+    if email:
+        user_cache.pop(email)
+
+def auth_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+# --- User search cache ---
+# GET /users/search results per (case-folded prefix, limit). Cleared on user
+# changes in this process; other workers catch up within USER_SEARCH_CACHE_TTL.
+USER_SEARCH_CACHE_MAXSIZE = int(os.getenv("USER_SEARCH_CACHE_MAXSIZE", "1024"))
+USER_SEARCH_CACHE_TTL = float(os.getenv("USER_SEARCH_CACHE_TTL", "30"))
+
+user_search_cache = TTLCache(maxsize=USER_SEARCH_CACHE_MAXSIZE, ttl=USER_SEARCH_CACHE_TTL)
@@ -0,0 +1,198 @@
+# your_project/compression.py
+import os
+import zlib
+from dotenv import load_dotenv
+
+# Brotli and Zstandard are optional: without the packages only gzip is offered.
+try:
+    import brotli
+except ImportError: # pragma: no cover - depends on the environment
+    brotli = None
+try:
+    import zstandard
+except ImportError: # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Server preference when the client accepts several encodings with the same q-value
+COMPRESSION_ENCODINGS = [
+    name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()
+]
+# Fast levels: list pages are compressed on every request, so encode time matters more than ratio
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Server-sent events must reach the client as they are written, so they are never compressed
+EXCLUDED_TYPES = ("text/event-stream",)
+
+class _GzipEncoder:
+    def __init__(self):
+        # wbits=31: gzip container
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+ENCODERS = {"gzip": _GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = _BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = _ZstdEncoder
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the encoding to use for an Accept-Encoding header, or None for identity.
+    Highest q-value wins; ties go to the COMPRESSION_ENCODINGS order.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in COMPRESSION_ENCODINGS:
+        if name not in ENCODERS:
+            continue
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+def _header(headers: list, name: bytes) -> bytes | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing JSON, NDJSON and text responses with the
+    best encoding the client accepts (zstd, br or gzip). Complete bodies under
+    COMPRESSION_MIN_SIZE pass through; streamed bodies (e.g. GET /tasks/export)
+    are compressed chunk by chunk. Strong ETags become weak, since they were
+    computed over the uncompressed bytes.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = next(
+            (value.decode("latin-1") for key, value in scope["headers"] if key == b"accept-encoding"), ""
+        )
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        encoder = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if encoder is None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                start, start_message = start_message, None
+                if not self._compressible(start["headers"], start["status"]) or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    await send(start)
+                    await send(message)
+                    # Anything else for this response passes through untouched
+                    encoder = False
+                    return
+                encoder = ENCODERS[encoding]()
+                headers = self._encoded_headers(start["headers"], encoding)
+                data = encoder.compress(body)
+                if not more_body:
+                    data += encoder.flush()
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            if encoder is False:
+                await send(message)
+                return
+            more_body = message.get("more_body", False)
+            data = encoder.compress(message.get("body", b""))
+            if not more_body:
+                data += encoder.flush()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(headers: list, status_code: int) -> bool:
+        if status_code < 200 or status_code in (204, 304):
+            return False
+        if _header(headers, b"content-encoding") is not None:
+            return False
+        content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+        if content_type.startswith(EXCLUDED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _encoded_headers(headers: list, encoding: str) -> list:
+        encoded = []
+        for key, value in headers:
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if name == b"vary":
+                continue
+            encoded.append((key, value))
+        vary = _header(headers, b"vary")
+        encoded.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        encoded.append((b"content-encoding", encoding.encode()))
+        return encoded
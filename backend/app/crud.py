@@ -1,28 +1,59 @@
 # your_project/crud.py
+from sqlalchemy import DateTime, false, func, extract, lambda_stmt, literal, select, insert, update, delete, tuple_, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from . import models, schemas
-from .auth import get_password_hash # Import from your auth.py
-from datetime import datetime
+from typing import Optional, List, Tuple
+from . import models, schemas, search, events, history, write_queue
+from .response_cache import invalidate_task_events, response_cache
+from .hashing import get_password_hash_sync as get_password_hash # Runs on the bounded hashing pool
+from .cache import invalidate_user, user_search_cache
+from datetime import date, datetime
+
+# Column projections matching the response schemas, in schema field order.
+# List endpoints select these as row tuples instead of loading full ORM entities.
+TASK_COLUMNS = [models.Task.__table__.c[name] for name in schemas.Task.model_fields]
+USER_COLUMNS = [models.User.__table__.c[name] for name in schemas.UserInDB.model_fields]
+
+# Hot lookups are lambda statements: after the first call SQLAlchemy skips
+# rebuilding the statement and its cache key, only pulls the bound value out
+# of the closure, and reuses the SQL from the engine's compiled cache.
+# List queries are select() constructs derived from these module-level bases,
+# so they share compiled-cache entries across calls with the same shape.
+TASK_SELECT = select(models.Task)
+TASK_ROWS_SELECT = select(*TASK_COLUMNS)
 
 # --- User CRUD Operations ---
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    # Runs on every authenticated request that misses the auth cache
+    return db.scalars(lambda_stmt(lambda: select(models.User).where(models.User.email == email).limit(1))).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    # Callers on the write queue hash up front so the writer never waits on bcrypt
+    hashed_password = hashed_password or get_password_hash(user.password)
     db_user = models.User(email=user.email, hashed_password=hashed_password, is_admin=user.is_admin)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    write_queue.after_commit(user_search_cache.clear)
+    return db_user
+
+def set_user_password_hash(db: Session, db_user: models.User, hashed_password: str):
+    # Used to upgrade outdated hashes on login; the cached principal has no hash, so no invalidation
+    db_user.hashed_password = hashed_password
+    db.commit()
     return db_user
 
 def get_user_by_id(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.scalars(lambda_stmt(lambda: select(models.User).where(models.User.id == user_id))).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, rows: bool = False):
+    # rows=True returns USER_COLUMNS row tuples instead of ORM entities
+    query = db.query(*USER_COLUMNS) if rows else db.query(models.User)
+    return query.order_by(models.User.id).offset(skip).limit(limit).all()
 
 def update_user(db: Session, db_user: models.User, user_update_data: dict):
+    previous_email = db_user.email
     for key, value in user_update_data.items():
         if key == "password" and value: # Handle password update if included
             db_user.hashed_password = get_password_hash(value)
@@ -30,44 +61,679 @@ def update_user(db: Session, db_user: models.User, user_update_data: dict):
             setattr(db_user, key, value)
     db.commit()
     db.refresh(db_user)
+    # Drop cached principals so role/email changes apply on the next request
+    write_queue.after_commit(invalidate_user, previous_email)
+    write_queue.after_commit(invalidate_user, db_user.email)
+    write_queue.after_commit(user_search_cache.clear)
+    # Cached task reads embed the email with expand=owner,assignee
+    scopes = _task_peer_ids(db, db_user.id) if db_user.email != previous_email else set()
+    write_queue.after_commit(response_cache.invalidate, scopes | {db_user.id})
     return db_user
 
 def delete_user(db: Session, user_id: int):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = get_user_by_id(db, user_id)
     if db_user:
+        scopes = _task_peer_ids(db, user_id) | {user_id}
         db.delete(db_user)
         db.commit()
+        write_queue.after_commit(invalidate_user, db_user.email)
+        write_queue.after_commit(user_search_cache.clear)
+        write_queue.after_commit(response_cache.invalidate, scopes)
     return db_user # Returns the deleted user or None if not found
 
+def _task_peer_ids(db: Session, user_id: int) -> set:
+    # Users sharing a task (active or archived) with user_id, i.e. the scopes
+    # whose cached task reads can name them
+    peers = [
+        select(other).where(this == user_id)
+        for model in (models.Task, models.ArchivedTask)
+        for this, other in ((model.owner_id, model.assignedTo), (model.assignedTo, model.owner_id))
+    ]
+    return {peer for peer in db.scalars(union_all(*peers)) if peer is not None}
+
+def search_users(db: Session, prefix: str, limit: int = 10):
+    # Range on lower(email) over ix_users_email_lower: rows come back in index
+    # order (an exact match first, then alphabetical), so the scan stops after
+    # `limit` rows whatever the user count. Returns (id, email) row tuples.
+    email = func.lower(models.User.email)
+    stmt = select(models.User.id, models.User.email).order_by(email).limit(limit)
+    folded = prefix.lower()
+    if folded:
+        stmt = stmt.where(email >= folded)
+        upper = _prefix_upper_bound(folded)
+        if upper is not None:
+            stmt = stmt.where(email < upper)
+    return db.execute(stmt).all()
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    # Smallest string above every string starting with the prefix: the prefix
+    # with its last character incremented. Trailing U+10FFFF can't be, so they
+    # are dropped first; None (no upper bound) if nothing is left. Surrogates
+    # aren't valid in stored text and are skipped.
+    stripped = prefix.rstrip(chr(0x10FFFF))
+    if not stripped:
+        return None
+    code = ord(stripped[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return stripped[:-1] + chr(code)
+
 # --- Task CRUD Operations ---
+def _publish(*task_events: dict):
+    # After commit (of the whole batch on the write queue): drop the cached
+    # reads of every scope that could see the tasks, then notify event subscribers
+    write_queue.after_commit(_notify, task_events)
+
+def _notify(task_events):
+    invalidate_task_events(task_events)
+    for event in task_events:
+        events.publish(event)
+
+def _visible_tasks(query, user_id: Optional[int], model=models.Task):
+    # Admins pass user_id=None and see everything; regular users only see
+    # tasks they created or are assigned to (same rule as routers/tasks.py).
+    # Works on both legacy Query and select() statements, and on either tier.
+    if user_id is None:
+        return query
+    return query.filter(
+        (model.owner_id == user_id) |
+        (model.assignedTo == user_id)
+    )
+
+def next_change_seqs(db: Session, count: int) -> range:
+    """
+    Take `count` delta sync sequence numbers in the caller's transaction.
+    The counter row stays locked until commit, which keeps the numbers in
+    commit order (see models.TaskChangeCounter).
+    """
+    if not count:
+        return range(0)
+    counter = models.TaskChangeCounter
+    stmt = update(counter).where(counter.id == 1).values(value=counter.value + count)
+    if db.get_bind().dialect.update_returning:
+        last = db.execute(stmt.returning(counter.value)).scalar_one()
+    else:
+        db.execute(stmt)
+        last = db.scalar(select(counter.value).where(counter.id == 1))
+    return range(last - count + 1, last + 1)
+
 def create_user_task(db: Session, task: schemas.TaskCreate, owner_id: int):
-    db_task = models.Task(**task.model_dump(), owner_id=owner_id)
+    db_task = models.Task(**task.model_dump(), owner_id=owner_id, change_seq=next_change_seqs(db, 1)[0])
     db.add(db_task)
+    db.flush() # Assigns the id and created_at the history row needs
+    history.record(db, [_created_change(db_task)])
     db.commit()
     db.refresh(db_task)
+    _publish(events.task_event("created", db_task))
     return db_task
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).offset(skip).limit(limit).all()
+def _filter_tasks(db: Session, query, filters: Optional[schemas.TaskFilter], model=models.Task):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.filter(model.status == filters.status)
+    if filters.priority is not None:
+        query = query.filter(model.priority == filters.priority)
+    if filters.assignedTo is not None:
+        query = query.filter(model.assignedTo == filters.assignedTo)
+    if filters.due_after is not None:
+        query = query.filter(model.dueDate >= filters.due_after)
+    if filters.due_before is not None:
+        query = query.filter(model.dueDate < filters.due_before)
+    if filters.q:
+        query = query.filter(search.text_match(db, filters.q, model))
+    return query
+
+def _page_stmt(stmt, skip: int, limit: int, after_id: Optional[int]):
+    # Keyset pagination on the primary key when a cursor is given, so deep
+    # pages don't pay for the skipped rows; offset stays for old clients.
+    stmt = stmt.order_by(models.Task.id)
+    if after_id is not None:
+        stmt = stmt.where(models.Task.id > after_id)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+def _rows_select(fields: Optional[List[str]], model=models.Task):
+    # Narrower projection for sparse fieldsets (`fields=` on GET /tasks/)
+    if not fields:
+        return TASK_ROWS_SELECT if model is models.Task else select(*[model.__table__.c[c.name] for c in TASK_COLUMNS])
+    return select(*[model.__table__.c[name] for name in fields])
+
+def _both_tiers(db: Session, user_id: Optional[int], skip: int, limit: int, after_id: Optional[int],
+                filters: Optional[schemas.TaskFilter], fields: Optional[List[str]]):
+    # Active and archived rows merged in id order. Each tier is filtered and
+    # cut to skip+limit rows on its own indexes before the merge.
+    tiers = []
+    for model in (models.Task, models.ArchivedTask):
+        stmt = _filter_tasks(db, _visible_tasks(_rows_select(fields, model), user_id, model), filters, model)
+        stmt = stmt.order_by(model.id)
+        if after_id is not None:
+            stmt = stmt.where(model.id > after_id)
+        tiers.append(select(stmt.limit(skip + limit).subquery()))
+    merged = union_all(*tiers).subquery()
+    stmt = select(merged).order_by(merged.c.id)
+    if after_id is None and skip:
+        stmt = stmt.offset(skip)
+    return db.execute(stmt.limit(limit)).all()
+
+def _fetch_tasks(db: Session, stmt, rows: bool):
+    # rows=True returns TASK_COLUMNS row tuples instead of ORM entities
+    return db.execute(stmt).all() if rows else db.scalars(stmt).all()
+
+def get_tasks(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+              filters: Optional[schemas.TaskFilter] = None, rows: bool = False, fields: Optional[List[str]] = None,
+              include_archived: bool = False):
+    # include_archived always returns rows (archived tasks have no Task entities)
+    if include_archived:
+        return _both_tiers(db, None, skip, limit, after_id, filters, fields)
+    stmt = _filter_tasks(db, _rows_select(fields) if rows else TASK_SELECT, filters)
+    return _fetch_tasks(db, _page_stmt(stmt, skip, limit, after_id), rows)
 
 def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+    return db.scalars(lambda_stmt(lambda: select(models.Task).where(models.Task.id == task_id))).first()
+
+def get_archived_task(db: Session, task_id: int):
+    return db.get(models.ArchivedTask, task_id)
+
+def get_user_summaries(db: Session, user_ids) -> dict:
+    # `expand=owner,assignee`: one IN query for every user a page of tasks
+    # refers to (the batch selectinload would issue), as id -> {id, email}
+    ids = {user_id for user_id in user_ids if user_id is not None}
+    if not ids:
+        return {}
+    rows = db.execute(select(models.User.id, models.User.email).where(models.User.id.in_(ids)))
+    return {row.id: row._asdict() for row in rows}
 
-def get_user_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).filter(models.Task.owner_id == user_id).offset(skip).limit(limit).all()
+def get_user_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    stmt = TASK_SELECT.where(models.Task.owner_id == user_id)
+    return _fetch_tasks(db, _page_stmt(stmt, skip, limit, after_id), rows=False)
+
+def get_visible_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                      filters: Optional[schemas.TaskFilter] = None, rows: bool = False, fields: Optional[List[str]] = None,
+                      include_archived: bool = False):
+    # Tasks the user created or is assigned to; `fields` narrows the rows=True projection
+    if include_archived:
+        return _both_tiers(db, user_id, skip, limit, after_id, filters, fields)
+    stmt = _visible_tasks(_rows_select(fields) if rows else TASK_SELECT, user_id)
+    return _fetch_tasks(db, _page_stmt(_filter_tasks(db, stmt, filters), skip, limit, after_id), rows)
+
+def warm_statement_cache(db: Session):
+    """
+    Run each hot statement once, with keys that match no rows, so their
+    compiled SQL is cached before real traffic arrives. Called at startup.
+    """
+    get_user_by_email(db, "")
+    get_user_by_id(db, 0)
+    get_task(db, 0)
+    get_user_tasks(db, user_id=0, limit=1)
+    for rows in (False, True):
+        for after_id in (None, 0):
+            get_tasks(db, limit=1, after_id=after_id, rows=rows)
+            get_visible_tasks(db, user_id=0, limit=1, after_id=after_id, rows=rows)
+    db.rollback()
+
+def iter_task_rows(db: Session, user_id: Optional[int], filters: Optional[schemas.TaskFilter] = None,
+                   batch_size: int = 1000, include_archived: bool = False):
+    # Streams TASK_COLUMNS rows as dicts in id order (active tasks, then the
+    # archive tier if asked); yield_per fetches in batches (server-side cursor
+    # where supported) instead of loading all rows
+    for model in (models.Task, models.ArchivedTask) if include_archived else (models.Task,):
+        columns = [model.__table__.c[column.name] for column in TASK_COLUMNS]
+        query = _filter_tasks(db, _visible_tasks(db.query(*columns), user_id, model), filters, model)
+        for row in query.order_by(model.id).yield_per(batch_size):
+            yield row._asdict()
 
 def update_task(db: Session, db_task: models.Task, task_update_data: dict):
+    previous_assignee, previous_status = db_task.assignedTo, db_task.status
     for key, value in task_update_data.items():
         if hasattr(db_task, key):
             setattr(db_task, key, value)
     db_task.updated_at = datetime.utcnow() # Update the timestamp
+    history.record(db, [_updated_change(db_task, previous_status, previous_assignee)])
+    loss = _visibility_loss(db_task.id, db_task.owner_id, previous_assignee, db_task.assignedTo, db_task.updated_at)
+    seqs = iter(next_change_seqs(db, 1 if loss is None else 2))
+    if loss is not None:
+        db.add(models.TaskDeletion(**loss, seq=next(seqs)))
+    db_task.change_seq = next(seqs)
     db.commit()
     db.refresh(db_task)
+    _publish(events.task_event("updated", db_task, previous_assignee))
     return db_task
 
-def delete_task(db: Session, task_id: int):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+def delete_task(db: Session, task_id: int, db_task: Optional[models.Task] = None):
+    # Callers that already loaded the row can pass it to skip the lookup
+    if db_task is None:
+        db_task = get_task(db, task_id)
     if db_task:
+        event = events.task_event("deleted", db_task) # Built before commit expires the row
+        history.record(db, [_deleted_change(db_task, datetime.utcnow())])
+        db.add(_tombstone(db_task, next_change_seqs(db, 1)[0]))
         db.delete(db_task)
         db.commit()
-    return db_task # Returns the deleted task or None if not found
\ No newline at end of file
+        _publish(event)
+    return db_task # Returns the deleted task or None if not found
+
+def _created_change(db_task):
+    return history.task_change(db_task.id, db_task.created_at, None, db_task.status, None, db_task.assignedTo, db_task.created_at)
+
+def _updated_change(db_task: models.Task, previous_status: Optional[str], previous_assignee: Optional[int]):
+    return history.task_change(
+        db_task.id, db_task.created_at, previous_status, db_task.status, previous_assignee, db_task.assignedTo, db_task.updated_at
+    )
+
+def _deleted_change(row, at: datetime):
+    return history.task_change(row.id, row.created_at, row.status, None, row.assignedTo, None, at)
+
+def _tombstone(db_task: models.Task, seq: int):
+    return models.TaskDeletion(task_id=db_task.id, owner_id=db_task.owner_id, assignedTo=db_task.assignedTo, seq=seq)
+
+def _visibility_loss(task_id: int, owner_id: Optional[int], previous_assignee: Optional[int],
+                     assignee: Optional[int], at: datetime) -> Optional[dict]:
+    # A task reassigned away from someone who doesn't own it drops out of
+    # their scope; a tombstone for them alone makes their delta sync remove it
+    if previous_assignee is None or previous_assignee in (assignee, owner_id):
+        return None
+    return {"task_id": task_id, "owner_id": None, "assignedTo": previous_assignee, "deleted_at": at, "visibility_lost": True}
+
+def get_task_changes(db: Session, user_id: Optional[int] = None, since_seq: int = 0, limit: int = 100):
+    """
+    Tasks changed and tombstones logged after the `since_seq` watermark,
+    scoped like read_tasks. Returns (tasks, deletions, watermark, has_more):
+    at most `limit` items between the two lists, in commit order, and the
+    watermark to pass back as since_seq.
+    """
+    tasks = _visible_tasks(db.query(models.Task), user_id) \
+        .filter(models.Task.change_seq > since_seq).order_by(models.Task.change_seq).limit(limit).all()
+
+    deletion = models.TaskDeletion
+    deletions_query = db.query(deletion).filter(deletion.seq > since_seq)
+    if user_id is None:
+        # Admins see every task, so losing an assignment hides nothing from them
+        deletions_query = deletions_query.filter(deletion.visibility_lost == false())
+    else:
+        # A visibility loss is skipped once the task is back in the user's scope
+        visible_again = _visible_tasks(select(models.Task.id), user_id).where(models.Task.id == deletion.task_id).exists()
+        deletions_query = deletions_query.filter(
+            (deletion.owner_id == user_id) |
+            ((deletion.assignedTo == user_id) & ((deletion.visibility_lost == false()) | ~visible_again))
+        )
+    deletions = deletions_query.order_by(deletion.seq).limit(limit).all()
+
+    # Merge the two pages and keep the first `limit` items, so the watermark
+    # never passes an item that wasn't returned
+    items = sorted([(task.change_seq, task) for task in tasks] + [(row.seq, row) for row in deletions], key=lambda item: item[0])
+    has_more = len(tasks) >= limit or len(deletions) >= limit
+    items = items[:limit]
+    watermark = items[-1][0] if items else since_seq
+    return (
+        [item for _, item in items if isinstance(item, models.Task)],
+        [item for _, item in items if isinstance(item, models.TaskDeletion)],
+        watermark,
+        has_more,
+    )
+
+def get_tasks_by_ids(db: Session, task_ids: List[int]):
+    if not task_ids:
+        return {}
+    tasks = db.query(models.Task).filter(models.Task.id.in_(set(task_ids))).all()
+    return {task.id: task for task in tasks}
+
+def bulk_apply_tasks(
+    db: Session,
+    creates: List[schemas.TaskCreate],
+    owner_id: int,
+    updates: List[Tuple[int, dict]],
+    delete_ids: List[int],
+):
+    """
+    Apply already-authorized creates, updates and deletes in a single transaction,
+    using executemany-style statements. Returns (created tasks in input order,
+    {task_id: updated task}); update targets deleted since they were authorized
+    are skipped and missing from the dict.
+    """
+    now = datetime.utcnow()
+    created = []
+    # Pre-change owner/assignee/status of the touched rows, for tombstones, history and change events
+    previous = {}
+    if updates or delete_ids:
+        touched = [task_id for task_id, _ in updates] + list(delete_ids)
+        previous = {
+            row.id: row for row in db.execute(
+                select(models.Task.id, models.Task.owner_id, models.Task.assignedTo, models.Task.status, models.Task.created_at)
+                .where(models.Task.id.in_(set(touched)))
+            )
+        }
+    updates = [(task_id, data) for task_id, data in updates if task_id in previous]
+    deleted = [previous[task_id] for task_id in dict.fromkeys(delete_ids) if task_id in previous]
+    losses = [
+        loss for loss in (
+            _visibility_loss(task_id, previous[task_id].owner_id, previous[task_id].assignedTo,
+                             data.get("assignedTo", previous[task_id].assignedTo), now)
+            for task_id, data in updates if task_id not in delete_ids
+        ) if loss is not None
+    ]
+    try:
+        # One counter bump covers every row written below
+        seqs = iter(next_change_seqs(db, len(creates) + len(updates) + len(losses) + len(deleted)))
+        if creates:
+            rows = [
+                {**task.model_dump(), "owner_id": owner_id, "created_at": now, "updated_at": now, "change_seq": next(seqs)}
+                for task in creates
+            ]
+            if db.get_bind().dialect.name == "sqlite":
+                # Asking SQLite for input-ordered RETURNING makes SQLAlchemy send one
+                # INSERT per row; ids are handed out in VALUES order, so sort by id instead
+                returned = sorted(db.scalars(insert(models.Task).returning(models.Task), rows).all(), key=lambda t: t.id)
+            else:
+                # insertmanyvalues batches the rows and keeps RETURNING in input order
+                returned = db.scalars(insert(models.Task).returning(models.Task, sort_by_parameter_order=True), rows).all()
+            # Snapshot before commit expires the rows, which would reload them one by one
+            created = [schemas.Task.model_validate(db_task) for db_task in returned]
+        changes = [_created_change(db_task) for db_task in created]
+        if updates:
+            db.execute(update(models.Task), [
+                {**data, "id": task_id, "updated_at": now, "change_seq": next(seqs)} for task_id, data in updates
+            ])
+            for task_id, data in updates:
+                row = previous[task_id]
+                changes.append(history.task_change(
+                    task_id, row.created_at,
+                    row.status, data.get("status", row.status),
+                    row.assignedTo, data.get("assignedTo", row.assignedTo),
+                    now,
+                ))
+        changes.extend(_deleted_change(row, now) for row in deleted)
+        history.record(db, changes)
+        tombstones = [{**loss, "seq": next(seqs)} for loss in losses]
+        tombstones.extend(
+            {"task_id": row.id, "owner_id": row.owner_id, "assignedTo": row.assignedTo, "deleted_at": now,
+             "visibility_lost": False, "seq": next(seqs)}
+            for row in deleted
+        )
+        if tombstones:
+            db.execute(insert(models.TaskDeletion), tombstones, execution_options={"render_nulls": True})
+        if deleted:
+            db.execute(delete(models.Task).where(models.Task.id.in_(delete_ids)), execution_options={"synchronize_session": False})
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    updated = get_tasks_by_ids(db, [task_id for task_id, _ in updates])
+
+    _publish(
+        *[events.task_event("created", db_task) for db_task in created],
+        *[events.task_event("updated", db_task, previous[db_task.id].assignedTo) for db_task in updated.values()],
+        *[events.task_event("deleted", row) for row in deleted],
+    )
+    return created, updated
+
+# --- Archive tier ---
+# change_seq only orders the active tier for delta sync
+ARCHIVE_COLUMNS = [column.name for column in models.Task.__table__.columns if column.name != "change_seq"]
+
+def archive_completed_tasks(db: Session, completed_before: datetime, batch_size: int = 500):
+    """
+    Move up to `batch_size` tasks completed (last updated) before `completed_before`
+    from tasks to tasks_archive in one short transaction, with a tombstone and a
+    task.archived event for each. Returns the moved rows.
+    """
+    task = models.Task
+    # Ids are never reused (tasks is AUTOINCREMENT on SQLite, a sequence
+    # elsewhere), so a moved id can't come back and collide in the archive
+    condition = (task.status == history.COMPLETED) & (task.updated_at < completed_before)
+    chunk = select(task.id).where(condition).order_by(task.id).limit(batch_size)
+    columns = [task.__table__.c[name] for name in ARCHIVE_COLUMNS]
+    stmt = delete(task).where(task.id.in_(chunk), condition)
+    if db.get_bind().dialect.delete_returning:
+        # The condition is re-checked per row, so a task reopened meanwhile stays put
+        moved = db.execute(stmt.returning(*columns), execution_options={"synchronize_session": False}).all()
+    else:
+        moved = db.execute(select(*columns).where(task.id.in_(chunk), condition).with_for_update()).all()
+        db.execute(task.__table__.delete().where(task.id.in_([row.id for row in moved])))
+    if moved:
+        now = datetime.utcnow()
+        db.execute(insert(models.ArchivedTask), [{**row._asdict(), "archived_at": now} for row in moved])
+        # To delta sync and event clients an archived task is gone from the
+        # active list (it stays readable with include_archived)
+        seqs = iter(next_change_seqs(db, len(moved)))
+        db.execute(insert(models.TaskDeletion), [
+            {"task_id": row.id, "owner_id": row.owner_id, "assignedTo": row.assignedTo, "deleted_at": now,
+             "visibility_lost": False, "seq": next(seqs)}
+            for row in moved
+        ], execution_options={"render_nulls": True})
+    db.commit()
+    if moved:
+        _publish(*[events.task_event("archived", row) for row in moved])
+    return moved
+
+# --- Task Statistics ---
+def get_task_stats(
+    db: Session,
+    user_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    # Both tiers: tasks moved to the archive still count (completed ones mostly)
+    def tier(model):
+        stmt = _visible_tasks(select(model.status, model.priority, model.assignedTo, model.created_at), user_id, model)
+        if created_after is not None:
+            stmt = stmt.where(model.created_at >= created_after)
+        if created_before is not None:
+            stmt = stmt.where(model.created_at < created_before)
+        return stmt
+
+    tasks = union_all(tier(models.Task), tier(models.ArchivedTask)).subquery()
+    count = func.count()
+    stats = {"total": 0, "by_status": {}, "by_priority": {}, "by_assignee": [], "by_month": []}
+
+    rows = db.execute(select(tasks.c.status, tasks.c.priority, count).group_by(tasks.c.status, tasks.c.priority)).all()
+    for task_status, priority, n in rows:
+        stats["total"] += n
+        stats["by_status"][task_status] = stats["by_status"].get(task_status, 0) + n
+        stats["by_priority"][priority] = stats["by_priority"].get(priority, 0) + n
+
+    assignees = {}
+    rows = db.execute(select(tasks.c.assignedTo, tasks.c.status, count).group_by(tasks.c.assignedTo, tasks.c.status)).all()
+    for assignee_id, task_status, n in rows:
+        entry = assignees.setdefault(assignee_id, {"assignedTo": assignee_id, "total": 0, "by_status": {}})
+        entry["total"] += n
+        entry["by_status"][task_status] = n
+    stats["by_assignee"] = list(assignees.values())
+
+    year = extract("year", tasks.c.created_at)
+    month = extract("month", tasks.c.created_at)
+    months = {}
+    rows = db.execute(select(year, month, tasks.c.status, count).group_by(year, month, tasks.c.status).order_by(year, month)).all()
+    for y, m, task_status, n in rows:
+        key = f"{int(y):04d}-{int(m):02d}"
+        entry = months.setdefault(key, {"month": key, "total": 0, "by_status": {}})
+        entry["total"] += n
+        entry["by_status"][task_status] = n
+    stats["by_month"] = list(months.values())
+
+    return stats
+
+
+# --- History rollup reports ---
+def _period(day, bucket: str) -> str:
+    if bucket == "month":
+        return day.strftime("%Y-%m")
+    if bucket == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year:04d}-W{week:02d}"
+    return day.isoformat()
+
+def _avg_hours(total_seconds: float, count: int) -> Optional[float]:
+    return round(total_seconds / count / 3600, 2) if count else None
+
+def get_status_trend(db: Session, start: date, end: date, bucket: str = "day"):
+    """
+    Tasks entering/leaving each status per period, with throughput (tasks
+    completed) and average cycle time, read from task_status_daily.
+    """
+    rollup = models.TaskStatusDaily
+    rows = db.scalars(
+        select(rollup).where(rollup.day >= start, rollup.day <= end).order_by(rollup.day)
+    ).all()
+    periods = {}
+    for row in rows:
+        key = _period(row.day, bucket)
+        point = periods.setdefault(key, {"period": key, "entered": {}, "exited": {}, "completed": 0, "cycle_seconds": 0.0})
+        point["entered"][row.status] = point["entered"].get(row.status, 0) + row.entered
+        point["exited"][row.status] = point["exited"].get(row.status, 0) + row.exited
+        if row.status == history.COMPLETED:
+            point["completed"] += row.entered
+            point["cycle_seconds"] += row.age_seconds
+    for point in periods.values():
+        point["avg_cycle_hours"] = _avg_hours(point.pop("cycle_seconds"), point["completed"])
+    return list(periods.values())
+
+def get_assignee_trend(db: Session, assignee_id: int, start: date, end: date, bucket: str = "day"):
+    # One assignee's assignments, completions and cycle time per period, from task_assignee_daily
+    rollup = models.TaskAssigneeDaily
+    rows = db.scalars(
+        select(rollup)
+        .where(rollup.assignee_id == assignee_id, rollup.day >= start, rollup.day <= end)
+        .order_by(rollup.day)
+    ).all()
+    periods = {}
+    for row in rows:
+        key = _period(row.day, bucket)
+        point = periods.setdefault(key, {"period": key, "assigned": 0, "unassigned": 0, "completed": 0, "cycle_seconds": 0.0})
+        point["assigned"] += row.assigned
+        point["unassigned"] += row.unassigned
+        point["completed"] += row.completed
+        point["cycle_seconds"] += row.cycle_seconds
+    for point in periods.values():
+        point["avg_cycle_hours"] = _avg_hours(point.pop("cycle_seconds"), point["completed"])
+    return list(periods.values())
+
+
+# --- Due-date scheduler and notifications ---
+DUE_COLUMNS = (models.Task.id, models.Task.title, models.Task.dueDate, models.Task.owner_id, models.Task.assignedTo)
+
+def get_tasks_due_between(db: Session, after_due: datetime, after_id: int, until: datetime, limit: int = 1000):
+    # One keyset chunk of open tasks with after_due < dueDate <= until, in
+    # (dueDate, id) order; a range scan on ix_tasks_dueDate_id
+    return db.execute(
+        select(*DUE_COLUMNS)
+        .where(
+            models.Task.dueDate <= until,
+            tuple_(models.Task.dueDate, models.Task.id) > tuple_(literal(after_due, DateTime), after_id),
+            models.Task.status != "completed",
+        )
+        .order_by(models.Task.dueDate, models.Task.id)
+        .limit(limit)
+    ).all()
+
+def get_open_tasks_due_info(db: Session, task_ids: List[int]):
+    # Current due date and recipients of the given tasks, skipping completed ones
+    rows = db.execute(
+        select(*DUE_COLUMNS).where(models.Task.id.in_(set(task_ids)), models.Task.status != "completed")
+    ).all()
+    return {row.id: row for row in rows}
+
+def create_notifications(db: Session, notifications: List[dict]):
+    """
+    Insert notifications in one statement, skipping ones that already exist
+    (another worker or an earlier run raised them). Returns the inserted rows.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        dialect_insert = None
+    if dialect_insert is not None:
+        stmt = dialect_insert(models.Notification).on_conflict_do_nothing()
+    else:
+        stmt = insert(models.Notification)
+    try:
+        rows = db.execute(
+            stmt.returning(models.Notification.id, models.Notification.user_id, models.Notification.task_id, models.Notification.kind),
+            notifications,
+        ).all()
+        db.commit()
+    except IntegrityError:
+        # Databases without ON CONFLICT: the batch overlaps an existing one, drop it
+        db.rollback()
+        return []
+    return rows
+
+def get_notifications(db: Session, user_id: int, before_id: Optional[int] = None, limit: int = 100, unread_only: bool = False):
+    stmt = select(models.Notification).where(models.Notification.user_id == user_id)
+    if before_id is not None:
+        stmt = stmt.where(models.Notification.id < before_id)
+    if unread_only:
+        stmt = stmt.where(models.Notification.read_at.is_(None))
+    # Newest first
+    return db.scalars(stmt.order_by(models.Notification.id.desc()).limit(limit)).all()
+
+def mark_notification_read(db: Session, user_id: int, notification_id: int):
+    db_notification = db.scalars(
+        select(models.Notification).where(models.Notification.id == notification_id, models.Notification.user_id == user_id)
+    ).first()
+    if db_notification and db_notification.read_at is None:
+        db_notification.read_at = datetime.utcnow()
+        db.commit()
+        db.refresh(db_notification)
+    return db_notification
+
+# --- Async variants (DB_ASYNC=true, used with database.get_async_db) ---
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email).limit(1))
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+async def get_task_async(db: AsyncSession, task_id: int):
+    return await db.get(models.Task, task_id)
+
+async def get_tasks_async(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    result = await db.scalars(_page_stmt(TASK_SELECT, skip, limit, after_id))
+    return result.all()
+
+async def get_visible_tasks_async(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    stmt = _visible_tasks(TASK_SELECT, user_id)
+    result = await db.scalars(_page_stmt(stmt, skip, limit, after_id))
+    return result.all()
+
+async def create_user_task_async(db: AsyncSession, task: schemas.TaskCreate, owner_id: int):
+    change_seq = (await db.run_sync(next_change_seqs, 1))[0]
+    db_task = models.Task(**task.model_dump(), owner_id=owner_id, change_seq=change_seq)
+    db.add(db_task)
+    await db.flush()
+    await db.run_sync(history.record, [_created_change(db_task)])
+    await db.commit()
+    await db.refresh(db_task)
+    _publish(events.task_event("created", db_task))
+    return db_task
+
+async def update_task_async(db: AsyncSession, db_task: models.Task, task_update_data: dict):
+    previous_assignee, previous_status = db_task.assignedTo, db_task.status
+    for key, value in task_update_data.items():
+        if hasattr(db_task, key):
+            setattr(db_task, key, value)
+    db_task.updated_at = datetime.utcnow() # Update the timestamp
+    await db.run_sync(history.record, [_updated_change(db_task, previous_status, previous_assignee)])
+    loss = _visibility_loss(db_task.id, db_task.owner_id, previous_assignee, db_task.assignedTo, db_task.updated_at)
+    seqs = iter(await db.run_sync(next_change_seqs, 1 if loss is None else 2))
+    if loss is not None:
+        db.add(models.TaskDeletion(**loss, seq=next(seqs)))
+    db_task.change_seq = next(seqs)
+    await db.commit()
+    await db.refresh(db_task)
+    _publish(events.task_event("updated", db_task, previous_assignee))
+    return db_task
+
+async def delete_task_async(db: AsyncSession, db_task: models.Task):
+    # Takes the already-loaded row instead of re-querying it by id
+    event = events.task_event("deleted", db_task)
+    await db.run_sync(history.record, [_deleted_change(db_task, datetime.utcnow())])
+    db.add(_tombstone(db_task, (await db.run_sync(next_change_seqs, 1))[0]))
+    await db.delete(db_task)
+    await db.commit()
+    _publish(event)
+    return db_task
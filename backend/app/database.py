@@ -1,25 +1,259 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
+import logging
+import math
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Get database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable not set.")
 
-engine = create_engine(DATABASE_URL)
+# --- Connection pool settings ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# --- Optional async engine ---
+# DB_ASYNC=true enables an AsyncEngine next to the sync one. ASYNC_DATABASE_URL
+# defaults to DATABASE_URL with an async driver (aiosqlite / asyncpg).
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def _is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _engine_kwargs(url) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single-connection pool; sizing options don't apply
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def _apply_sqlite_pragmas(sync_engine, read_only: bool = False):
+    # WAL lets readers run alongside the single writer, NORMAL sync is safe
+    # under WAL, and busy_timeout makes writers wait instead of failing with
+    # "database is locked". Read-only connections can't change the journal mode.
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+def _async_url(url):
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()} databases.")
+    return url.set(drivername=driver)
+
+def make_engine(url, **pool_overrides):
+    # Engine with the shared pool settings and SQLite pragmas; pool_overrides resize its pool
+    kwargs = _engine_kwargs(url)
+    if kwargs:
+        kwargs.update(pool_overrides)
+    new_engine = create_engine(url, **kwargs)
+    if _is_sqlite(url):
+        _apply_sqlite_pragmas(new_engine)
+    return new_engine
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_kwargs(ASYNC_DATABASE_URL))
+    if _is_sqlite(ASYNC_DATABASE_URL):
+        _apply_sqlite_pragmas(async_engine.sync_engine)
+    # expire_on_commit=False: attributes can't be lazily reloaded outside an await
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# --- Optional read replica ---
+# DATABASE_READ_URL points GET routes (via get_read_db) at a read-only
+# replica. A client's reads go to the primary for READ_AFTER_WRITE_SECONDS
+# after its own writes (READ_PRIMARY_COOKIE), and all reads fail over to the primary while the
+# replica fails its health check or lags more than REPLICA_MAX_LAG_SECONDS.
+# Locally, a read-only URI of the same SQLite file works as a stand-in:
+#   DATABASE_READ_URL=sqlite:///file:tasks.db?mode=ro&uri=true
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+
+# Replay lag of a Postgres standby; 0 when it has applied everything it received
+PG_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# Marker cookie set on every successful write request (ReadAfterWriteMiddleware).
+# The browser sends it back until it expires, so the user's reads go to the
+# primary for READ_AFTER_WRITE_SECONDS whichever worker or host serves them.
+READ_PRIMARY_COOKIE = "read_primary"
+
+class ReadAfterWriteMiddleware:
+    """
+    Sets READ_PRIMARY_COOKIE on successful non-GET responses. Pure ASGI, so
+    streamed responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={math.ceil(READ_AFTER_WRITE_SECONDS)}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", self.cookie)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+class ReplicaHealth:
+    """
+    Replica liveness and lag, checked at most every `interval` seconds on the
+    request path. Connection errors on the replica mark it down immediately.
+    """
+
+    def __init__(self, engine, interval: float, max_lag: float):
+        self.engine = engine
+        self.interval = interval
+        self.max_lag = max_lag
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.failovers = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _check(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                if self.engine.dialect.name == "postgresql":
+                    self.lag_seconds = float(conn.execute(PG_REPLICA_LAG_SQL).scalar() or 0)
+            healthy = self.lag_seconds is None or self.lag_seconds <= self.max_lag
+        except Exception:
+            logger.warning("Read replica health check failed; reading from the primary", exc_info=True)
+            healthy = False
+        if self.healthy and not healthy:
+            self.failovers += 1
+        self.healthy = healthy
+
+    def usable(self) -> bool:
+        now = time.monotonic()
+        if now >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = now + self.interval
+                self._check()
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    def mark_failed(self) -> None:
+        if self.healthy:
+            self.failovers += 1
+            logger.warning("Read replica connection failed; reading from the primary")
+        self.healthy = False
+        self._next_check = time.monotonic() + self.interval
+
+read_engine = None
+replica = None
+if DATABASE_READ_URL:
+    read_engine = create_engine(DATABASE_READ_URL, **_engine_kwargs(DATABASE_READ_URL))
+    if _is_sqlite(DATABASE_READ_URL):
+        _apply_sqlite_pragmas(read_engine, read_only=True)
+    replica = ReplicaHealth(read_engine, REPLICA_HEALTH_CHECK_SECONDS, REPLICA_MAX_LAG_SECONDS)
+
+    @event.listens_for(read_engine, "handle_error")
+    def _replica_error(context):
+        if context.is_disconnect or context.connection is None:
+            replica.mark_failed()
+
+read_counts = {"primary": 0, "replica": 0}
+
+class ReadSession(Session):
+    """
+    Session for read-only routes. The engine is chosen on first use, after
+    authentication has run, and kept for the rest of the request.
+    """
+
+    def get_bind(self, mapper=None, **kwargs):
+        bind = self.info.get("bind")
+        if bind is None:
+            use_replica = read_engine is not None and not self.info.get("primary") and replica.usable()
+            bind = self.info["bind"] = read_engine if use_replica else engine
+            read_counts["replica" if use_replica else "primary"] += 1
+        return bind
+
+ReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
+
+def is_replica_session(db: Session) -> bool:
+    return read_engine is not None and db.info.get("bind") is read_engine
+
+def read_routing_stats() -> dict:
+    return {
+        "replica_configured": read_engine is not None,
+        "replica_healthy": replica.healthy if replica else None,
+        "replica_lag_seconds": replica.lag_seconds if replica else None,
+        "failovers": replica.failovers if replica else 0,
+        "reads": dict(read_counts),
+    }
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def read_session(request: Request) -> ReadSession:
+    # Reads from the primary while the client carries the read-after-write marker
+    return ReadSessionLocal(info={"primary": READ_PRIMARY_COOKIE in request.cookies})
+
+def get_read_db(request: Request):
+    # Same as get_db when no replica is configured
+    db = read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled; set DB_ASYNC=true.")
+    async with AsyncSessionLocal() as db:
+        yield db
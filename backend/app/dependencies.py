@@ -1,23 +1,41 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+import time
+from jose import jwt
 from .auth import decode_access_token
+from .cache import token_cache, user_cache
 from .database import get_db
 from .crud import get_user_by_email
-from .schemas import TokenData
+from .schemas import TokenData, UserInDB
 from .models import User as DBUser # Alias to avoid name conflict with Pydantic User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+def decode_token_cached(token: str) -> TokenData:
+    token_data = token_cache.get(token)
+    if token_data is None:
+        token_data = decode_access_token(token)
+        # Never keep a decoded token around past its own expiry
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+        ttl = expires_at - time.time() if expires_at else None
+        token_cache.set(token, token_data, ttl=ttl)
+    return token_data
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    token_data = decode_access_token(token)
-    user = get_user_by_email(db, email=token_data.email)
+    token_data = decode_token_cached(token)
+    user = user_cache.get(token_data.email)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        db_user = get_user_by_email(db, email=token_data.email)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # Cache a detached snapshot rather than the session-bound ORM object
+        user = UserInDB.model_validate(db_user)
+        user_cache.set(token_data.email, user)
     return user
 
 async def get_current_admin_user(current_user: DBUser = Depends(get_current_user)):
@@ -0,0 +1,10 @@
+# your_project/errors.py
+# Errors raised below the routers (crud, the write queue, the hashing pool).
+# Routes translate them to HTTP responses; scripts calling crud directly just
+# see ordinary exceptions.
+
+class NotFound(Exception):
+    """A row an operation refers to no longer exists."""
+
+class ServerBusy(Exception):
+    """A bounded queue or pool is full; the caller should retry shortly."""
@@ -0,0 +1,207 @@
+# your_project/events.py
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+
+from . import schemas
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Task change feed. crud publishes an event after each committed task write;
+# every open /tasks/events stream receives the ones its user may see.
+# By default events stay in this process. Set EVENTS_BROKER_URL to a
+# Redis-compatible server (redis://...) to fan out across workers.
+EVENTS_BROKER_URL = os.getenv("EVENTS_BROKER_URL")
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "taskflow:task-events")
+# Events buffered per connection before the slow client is told to resync
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Idle streams get a comment line this often so proxies keep them open
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Backoff between attempts to resubscribe after the broker connection fails
+EVENTS_RECONNECT_MIN_SECONDS = float(os.getenv("EVENTS_RECONNECT_MIN_SECONDS", "0.5"))
+EVENTS_RECONNECT_MAX_SECONDS = float(os.getenv("EVENTS_RECONNECT_MAX_SECONDS", "30"))
+
+RESYNC_EVENT = {"type": "resync"}
+
+def task_event(kind: str, task, previous_assignee: Optional[int] = None) -> dict:
+    """
+    Build a "task.<kind>" event. `task` is an ORM row or schemas.Task; deletions
+    and archivals only carry the id. previous_assignee lets a user who was just unassigned
+    learn that the task left their view (see event_for).
+    """
+    payload = schemas.Task.model_validate(task).model_dump(mode="json") if kind not in ("deleted", "archived") else {"id": task.id}
+    return {
+        "type": f"task.{kind}",
+        "task": payload,
+        "owner_id": task.owner_id,
+        "assignedTo": task.assignedTo,
+        "previous_assignedTo": previous_assignee,
+    }
+
+def event_for(event: dict, user_id: int, is_admin: bool) -> Optional[dict]:
+    """
+    What `user_id` may receive of `event`: the event itself when they can see
+    the task, an id-only "task.removed" when it was just reassigned away from
+    them (the same as /tasks/changes reporting it deleted), else None.
+    """
+    if is_admin or event["type"] == "resync" or user_id in (event.get("owner_id"), event.get("assignedTo")):
+        return event
+    if user_id == event.get("previous_assignedTo"):
+        return {"type": "task.removed", "task": {"id": event["task"]["id"]}}
+    return None
+
+class Subscription:
+    """
+    One connected client. Events land in a bounded queue; when the client
+    can't keep up, the backlog is dropped and replaced by a single resync
+    event so the client refetches (e.g. via /tasks/changes) instead of the
+    server buffering without limit.
+    """
+
+    def __init__(self, user_id: int, is_admin: bool, maxsize: int = EVENTS_QUEUE_SIZE):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def _offer(self, event: dict) -> None:
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    def deliver(self, event: dict) -> None:
+        # Safe to call from any thread (sync routes run in a threadpool)
+        event = event_for(event, self.user_id, self.is_admin)
+        if event is not None:
+            self.loop.call_soon_threadsafe(self._offer, event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, is_admin: bool) -> Subscription:
+        subscription = Subscription(user_id, is_admin)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _fan_out(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def publish(self, event: dict) -> None:
+        self._fan_out(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "dropped": sum(s.dropped for s in self._subscribers),
+            }
+
+    def close(self) -> None:
+        pass
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes to a Redis-compatible pub/sub channel; a listener thread feeds
+    every event (including this worker's own) to the local subscribers.
+    If the connection drops, the listener resubscribes with exponential
+    backoff and tells every subscriber to resync, since events published in
+    the meantime are lost.
+    """
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("EVENTS_BROKER_URL is set but the 'redis' package is not installed.")
+        self.channel = channel
+        self.reconnects = 0
+        self._client = redis.Redis.from_url(url)
+        self._closed = threading.Event()
+        self._pubsub = self._subscribe()
+        self._thread = threading.Thread(target=self._listen, name="task-events", daemon=True)
+        self._thread.start()
+
+    def _subscribe(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        return pubsub
+
+    def _listen(self) -> None:
+        delay = EVENTS_RECONNECT_MIN_SECONDS
+        while not self._closed.is_set():
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self._subscribe()
+                    self.reconnects += 1
+                    logger.info("Resubscribed to %s", self.channel)
+                    self._fan_out(RESYNC_EVENT)
+                for message in self._pubsub.listen():
+                    delay = EVENTS_RECONNECT_MIN_SECONDS
+                    try:
+                        self._fan_out(json.loads(message["data"]))
+                    except (ValueError, TypeError, KeyError):
+                        logger.warning("Ignoring malformed task event on %s", self.channel)
+                raise ConnectionError("subscription ended")
+            except Exception:
+                if self._closed.is_set():
+                    return
+                logger.exception("Task event subscription to %s failed; retrying in %.1fs", self.channel, delay)
+                if self._pubsub is not None:
+                    try:
+                        self._pubsub.close()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+                self._closed.wait(delay)
+                delay = min(delay * 2, EVENTS_RECONNECT_MAX_SECONDS)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "reconnects": self.reconnects}
+
+    def publish(self, event: dict) -> None:
+        try:
+            self._client.publish(self.channel, json.dumps(event))
+        except Exception:
+            # The write is already committed; a lost event is recovered by clients resyncing
+            logger.exception("Failed to publish task event")
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._pubsub is not None:
+            self._pubsub.close()
+        self._client.close()
+
+broker = RedisBroker(EVENTS_BROKER_URL, EVENTS_CHANNEL) if EVENTS_BROKER_URL else InProcessBroker()
+
+def publish(event: dict) -> None:
+    broker.publish(event)
@@ -0,0 +1,97 @@
+# your_project/hashing.py
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from . import auth
+from .errors import ServerBusy
+
+# Load environment variables from .env file
+load_dotenv()
+
+# bcrypt is CPU-bound and takes ~100-300 ms, so it runs on a dedicated pool
+# instead of the event loop (or FastAPI's shared threadpool).
+# "thread" works because bcrypt releases the GIL; "process" sidesteps it fully.
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# Hash jobs allowed to wait for a worker before new ones are rejected with 503
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", str(HASH_WORKERS * 8)))
+
+class HashingPool:
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError("HASH_EXECUTOR must be 'thread' or 'process'.")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_pending_seen = 0
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing the app doesn't spawn workers
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+        return self._executor
+
+    def _done(self, _future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ServerBusy("Server is busy, please retry shortly")
+            executor = self._get_executor()
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def run_sync(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self.pending, self.workers),
+                "queue_depth": max(0, self.pending - self.workers),
+                "max_pending_seen": self.max_pending_seen,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+hash_pool = HashingPool(HASH_EXECUTOR, HASH_WORKERS, HASH_MAX_QUEUE)
+
+# --- Entry points ---
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    return await hash_pool.run(auth.verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await hash_pool.run(auth.get_password_hash, password)
+
+def get_password_hash_sync(password: str) -> str:
+    # For sync code paths (crud, scripts); blocks the calling thread only
+    return hash_pool.run_sync(auth.get_password_hash, password)
@@ -0,0 +1,120 @@
+# your_project/history.py
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Task status/assignee history. Every change appends a task_events row and
+# bumps the daily rollups (task_status_daily, task_assignee_daily) in the
+# same transaction as the change itself, so reports read a few rows per day
+# instead of replaying events. Rollups are upserted with additive counters,
+# which concurrent writers can apply in any order.
+COMPLETED = "completed"
+
+STATUS_COUNTERS = ("entered", "exited", "age_seconds")
+ASSIGNEE_COUNTERS = ("assigned", "unassigned", "completed", "cycle_seconds")
+
+def task_change(
+    task_id: int,
+    created_at: Optional[datetime],
+    from_status: Optional[str],
+    to_status: Optional[str],
+    from_assignee: Optional[int],
+    to_assignee: Optional[int],
+    at: datetime,
+) -> Optional[dict]:
+    """
+    A status and/or assignee transition, or None if neither changed.
+    from_status=None means the task was created, to_status=None that it was deleted.
+    """
+    if from_status == to_status and from_assignee == to_assignee:
+        return None
+    return {
+        "task_id": task_id,
+        "at": at,
+        "from_status": from_status,
+        "to_status": to_status,
+        "from_assignee": from_assignee,
+        "to_assignee": to_assignee,
+        # Task age when it entered to_status; for "completed" this is the cycle time
+        "age_seconds": (at - created_at).total_seconds() if created_at else 0.0,
+    }
+
+def _rollup_rows(changes: List[dict]):
+    status_rows = defaultdict(lambda: dict.fromkeys(STATUS_COUNTERS, 0))
+    assignee_rows = defaultdict(lambda: dict.fromkeys(ASSIGNEE_COUNTERS, 0))
+    for change in changes:
+        day = change["at"].date()
+        if change["from_status"] != change["to_status"]:
+            if change["from_status"] is not None:
+                status_rows[day, change["from_status"]]["exited"] += 1
+            if change["to_status"] is not None:
+                row = status_rows[day, change["to_status"]]
+                row["entered"] += 1
+                row["age_seconds"] += change["age_seconds"]
+            if change["to_status"] == COMPLETED and change["to_assignee"] is not None:
+                row = assignee_rows[change["to_assignee"], day]
+                row["completed"] += 1
+                row["cycle_seconds"] += change["age_seconds"]
+        if change["from_assignee"] != change["to_assignee"]:
+            if change["from_assignee"] is not None:
+                assignee_rows[change["from_assignee"], day]["unassigned"] += 1
+            if change["to_assignee"] is not None:
+                assignee_rows[change["to_assignee"], day]["assigned"] += 1
+    # Key order keeps row locks taken in the same order by concurrent writers
+    return (
+        [{"day": day, "status": status, **counters} for (day, status), counters in sorted(status_rows.items())],
+        [{"assignee_id": assignee_id, "day": day, **counters} for (assignee_id, day), counters in sorted(assignee_rows.items())],
+    )
+
+def _upsert(db: Session, model, keys: tuple, counters: tuple, rows: List[dict]) -> None:
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+        )
+        db.execute(stmt, rows)
+        return
+    # Other databases: update, then insert the rows that didn't exist yet
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .where(*[table.c[key] == row[key] for key in keys])
+            .values({name: table.c[name] + row[name] for name in counters})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table), row)
+
+def record(db: Session, changes: List[Optional[dict]]) -> None:
+    """
+    Append the changes to task_events and fold them into the daily rollups.
+    Executes on the caller's transaction; the caller commits. Async sessions
+    call it through AsyncSession.run_sync.
+    """
+    changes = [change for change in changes if change is not None]
+    if not changes:
+        return
+    # render_nulls: the ORM would otherwise leave out None values and split
+    # the rows into one INSERT per distinct set of non-null columns
+    db.execute(insert(models.TaskEvent), [
+        {key: value for key, value in change.items() if key != "age_seconds"} for change in changes
+    ], execution_options={"render_nulls": True})
+    fold(db, changes)
+
+def fold(db: Session, changes: List[dict]) -> None:
+    # Rollups only, without appending events (used directly by the migrate_db backfill)
+    status_rows, assignee_rows = _rollup_rows(changes)
+    _upsert(db, models.TaskStatusDaily, ("day", "status"), STATUS_COUNTERS, status_rows)
+    _upsert(db, models.TaskAssigneeDaily, ("assignee_id", "day"), ASSIGNEE_COUNTERS, assignee_rows)
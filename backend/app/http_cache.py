@@ -0,0 +1,24 @@
+# your_project/http_cache.py
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+# Strong ETags over the exact response bytes, so a client that sends back
+# If-None-Match gets an empty 304 when nothing it can see has changed.
+JSON_MEDIA_TYPE = "application/json"
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def etag_response(request: Request, body: bytes, headers: Optional[dict] = None) -> Response:
+    headers = {**(headers or {}), "ETag": make_etag(body), "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -1,21 +1,71 @@
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from . import models, schemas, crud, auth
-from .database import engine, get_db
+from . import models, schemas, crud, auth, cache, hashing, events, metrics, write_queue
+from .admission import ADMISSION_ENABLED, AdmissionMiddleware, admission
+from .compression import CompressionMiddleware
+from .response_cache import response_cache
+from .database import (
+    READ_AFTER_WRITE_SECONDS, ReadAfterWriteMiddleware, SessionLocal, ReadSessionLocal, engine, read_engine,
+    async_engine, get_db, read_routing_stats,
+)
 from .dependencies import get_current_user, get_current_admin_user
+from .errors import NotFound, ServerBusy
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import notifications, reports, tasks, users
+from .archive import ARCHIVE_ENABLED, archiver
+from .scheduler import SCHEDULER_ENABLED, scheduler
+from .write_queue import WRITE_QUEUE_ENABLED, writer
+
+metrics.instrument_engine(engine)
+if read_engine is not None:
+    metrics.instrument_engine(read_engine)
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine)
+metrics.instrument_engine(write_queue.writer_engine)
 
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create missing tables, then run the hot CRUD statements once so the
+    # first requests find them in the compiled-statement cache
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        crud.warm_statement_cache(db)
+    if read_engine is not None:
+        with ReadSessionLocal() as db:
+            crud.warm_statement_cache(db)
+    if WRITE_QUEUE_ENABLED:
+        writer.start()
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    if ARCHIVE_ENABLED:
+        archiver.start()
+    yield
+    await archiver.stop()
+    await scheduler.stop()
+    # Applies whatever is still queued before the engine goes away
+    writer.stop()
+    # Release pooled connections and hashing workers on shutdown
+    hashing.hash_pool.shutdown()
+    events.broker.close()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+    engine.dispose()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # --- CORS Configuration ---
 # Get frontend origin from environment variable
@@ -29,25 +79,62 @@ origins = [
     # e.g., "https://your-production-frontend.com"
 ]
 
+# Inside CORS, so 429/503 answers still carry the CORS headers the browser needs to read them
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Retry-After"],
 )
 # --- End CORS Configuration ---
 
+# Read-your-writes across workers when GET routes read from a replica
+if read_engine is not None and READ_AFTER_WRITE_SECONDS > 0:
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+# Compresses JSON/NDJSON/CSV bodies for clients that accept zstd, br or gzip
+app.add_middleware(CompressionMiddleware)
+
+# Added last so it wraps everything, CORS included
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+# The write queue and the hashing pool are bounded; any route using them can hit this
+@app.exception_handler(ServerBusy)
+async def server_busy(request, exc: ServerBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
 
 @app.post("/token", response_model=schemas.Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    if user:
+        # bcrypt runs on the hashing pool so the event loop keeps serving other requests
+        is_valid, new_hash = await hashing.verify_and_update_password(form_data.password, user.hashed_password)
+    if not user or not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Through the write queue when it runs; waiting on it blocks, so off the event loop
+        try:
+            user = await run_in_threadpool(write_queue.run, db, crud.set_user_password_hash, db_user=user, hashed_password=new_hash)
+        except NotFound: # Deleted while queued for the writer
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
         data={"sub": user.email, "is_admin": user.is_admin}, expires_delta=access_token_expires
@@ -59,8 +146,94 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db_user = crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    hashed_password = hashing.get_password_hash_sync(user.password)
+    return write_queue.run(db, crud.create_user, user=user, hashed_password=hashed_password)
 
 @app.get("/users/me/", response_model=schemas.UserInDB)
 async def read_users_me(current_user: schemas.UserInDB = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+    return current_user
+
+@app.get("/admin/cache/stats")
+def read_cache_stats(current_admin: schemas.UserInDB = Depends(get_current_admin_user)):
+    """
+    Hit/miss counters of the auth, user search and task response caches and SQLAlchemy's compiled-statement cache (admin only).
+    """
+    return {
+        "auth": cache.auth_cache_stats(),
+        "user_search": cache.user_search_cache.stats(),
+        "responses": response_cache.stats(),
+        "sql": metrics.compiled_cache_stats(),
+    }
+
+@app.get("/admin/hashing/stats")
+def read_hashing_stats(current_admin: schemas.UserInDB = Depends(get_current_admin_user)):
+    """
+    Password hashing pool concurrency and queue-depth counters (admin only).
+    """
+    return hashing.hash_pool.stats()
+
+@app.get("/admin/scheduler/stats")
+def read_scheduler_stats(current_admin: schemas.UserInDB = Depends(get_current_admin_user)):
+    """
+    Due-date scheduler heap size and notification counters (admin only).
+    """
+    return scheduler.stats()
+
+@app.get("/admin/database/stats")
+def read_database_stats(current_admin: schemas.UserInDB = Depends(get_current_admin_user)):
+    """
+    Read replica routing, write queue batching and archive job counters (admin only).
+    """
+    return {**read_routing_stats(), "write_queue": writer.stats(), "archive": archiver.stats()}
+
+@app.get("/admin/admission/stats")
+def read_admission_stats(current_admin: schemas.UserInDB = Depends(get_current_admin_user)):
+    """
+    Rate limit rejections and in-flight requests per route class against their caps (admin only).
+    """
+    return admission.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """
+    Prometheus scrape endpoint: request latency, SQL counts/time, pool waits,
+    slow statements and the in-process cache, hashing and event feed gauges.
+    """
+    auth_stats = cache.auth_cache_stats()
+    hash_stats = hashing.hash_pool.stats()
+    broker_stats = events.broker.stats()
+    scheduler_stats = scheduler.stats()
+    routing_stats = read_routing_stats()
+    write_stats = writer.stats()
+    admission_stats = admission.stats()
+    body = metrics.render(extra_gauges=[
+        ("taskflow_auth_cache_hits", "Auth cache hits since start.",
+         [({"cache": name}, stats["hits"]) for name, stats in auth_stats.items()]),
+        ("taskflow_auth_cache_misses", "Auth cache misses since start.",
+         [({"cache": name}, stats["misses"]) for name, stats in auth_stats.items()]),
+        ("taskflow_auth_cache_size", "Auth cache entries.",
+         [({"cache": name}, stats["size"]) for name, stats in auth_stats.items()]),
+        ("taskflow_hashing_in_flight", "Password hashes running.", [({}, hash_stats["in_flight"])]),
+        ("taskflow_hashing_queue_depth", "Password hashes waiting for a worker.", [({}, hash_stats["queue_depth"])]),
+        ("taskflow_hashing_rejected", "Password hash jobs rejected as overloaded.", [({}, hash_stats["rejected"])]),
+        ("taskflow_scheduler_tracked_tasks", "Open tasks held in the due-date heap.", [({}, scheduler_stats["tracked_tasks"])]),
+        ("taskflow_scheduler_notifications", "Notifications persisted by the due-date scheduler.", [({}, scheduler_stats["persisted"])]),
+        ("taskflow_db_reads", "Read sessions routed to the primary or the replica.",
+         [({"target": target}, count) for target, count in routing_stats["reads"].items()]),
+        ("taskflow_db_replica_failovers", "Times the read replica was marked unhealthy.", [({}, routing_stats["failovers"])]),
+        ("taskflow_write_queue_depth", "Writes waiting for the write queue's writer.", [({}, write_stats["queue_depth"])]),
+        ("taskflow_write_queue_batches", "Batches committed by the write queue.", [({}, write_stats["batches"])]),
+        ("taskflow_write_queue_operations", "Writes committed by the write queue.", [({}, write_stats["operations"])]),
+        ("taskflow_event_subscribers", "Open task event streams.", [({}, broker_stats["subscribers"])]),
+        ("taskflow_admission_in_flight", "Requests in flight per route class.",
+         [({"class": name}, count) for name, count in admission_stats["in_flight"].items()]),
+        ("taskflow_admission_rejected", "Requests rejected by rate limits or concurrency caps.",
+         [({"reason": reason}, count) for reason, count in admission_stats["rejected"].items()]),
+    ])
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+# Routers are included after the routes above so those keep precedence
+app.include_router(tasks.router)
+app.include_router(users.router)
+app.include_router(notifications.router)
+app.include_router(reports.router)
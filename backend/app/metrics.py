@@ -0,0 +1,253 @@
+# your_project/metrics.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import Counter as _Tally, deque
+from contextvars import ContextVar
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Request and SQL instrumentation, exposed in Prometheus text format at /metrics.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_SAMPLES = int(os.getenv("SLOW_QUERY_SAMPLES", "20"))
+# Warn when one request runs the same statement more than this many times (0 disables)
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def values(self) -> dict:
+        # Snapshot of {labelvalues tuple: value}
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict = {} # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _labels(self.labelnames, labelvalues, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                inf = _labels(self.labelnames, labelvalues, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(series[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {series[-1]}")
+        return lines
+
+def _gauges(name: str, help_text: str, samples) -> list:
+    # samples: iterable of (labels dict, value)
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+    return lines
+
+REQUEST_LATENCY = Histogram("taskflow_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+REQUESTS = Counter("taskflow_http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+QUERIES_PER_REQUEST = Histogram("taskflow_db_queries_per_request", "SQL statements issued per request.", ("route",), QUERY_COUNT_BUCKETS)
+SQL_TIME = Counter("taskflow_db_query_seconds_total", "Total time spent executing SQL, by route.", ("route",))
+POOL_WAIT = Histogram("taskflow_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", (), POOL_WAIT_BUCKETS)
+SLOW_QUERIES = Counter("taskflow_db_slow_queries_total", f"Statements slower than SLOW_QUERY_MS ({SLOW_QUERY_MS} ms).", ("route",))
+N_PLUS_ONE = Counter("taskflow_db_n_plus_one_warnings_total", "Requests that repeated one statement more than N_PLUS_ONE_THRESHOLD times.", ("route",))
+COMPILED_CACHE = Counter("taskflow_db_compiled_cache_total", "Statement executions by SQLAlchemy compiled-cache outcome.", ("result",))
+
+_slow_samples: deque = deque(maxlen=SLOW_QUERY_SAMPLES)
+
+# --- Per-request SQL accounting ---
+class RequestStats:
+    __slots__ = ("scope", "queries", "sql_seconds", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = _Tally() if N_PLUS_ONE_THRESHOLD else None
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope once routing is done
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+# Set by the middleware; sync routes see it too because the threadpool copies the context
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    # hit / miss, or why the statement wasn't cacheable (e.g. no_cache_key for raw SQL)
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        COMPILED_CACHE.inc(cache_hit.name.lower())
+    stats = current_request.get()
+    route = stats.route if stats is not None else "background"
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements[statement] += 1
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(route)
+        # Labelled by a short hash of the (parameterized) statement, which keeps
+        # label values bounded and SQL out of the metrics; the text goes to the log
+        text = " ".join(statement.split())
+        statement_id = hashlib.sha1(text.encode()).hexdigest()[:12]
+        _slow_samples.append((route, statement_id, elapsed))
+        logger.warning("Slow statement %s on %s: %.1f ms: %s", statement_id, route, elapsed * 1000, text[:1000])
+
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute; drop its start time so
+    # the stack on the pooled connection doesn't grow or pair up wrongly
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None:
+        starts = conn.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+def instrument_engine(engine) -> None:
+    """
+    Attach query timing hooks to a (sync) engine and time pool checkouts.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    # The pool has no "before checkout" event, so time Pool.connect itself
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status codes and the SQL
+    issued while handling each request. Routes are labelled by their path
+    template (e.g. /tasks/{task_id}) to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            method = scope["method"]
+            REQUEST_LATENCY.observe(elapsed, method, stats.route)
+            REQUESTS.inc(method, stats.route, str(status_code))
+            QUERIES_PER_REQUEST.observe(stats.queries, stats.route)
+            SQL_TIME.inc(stats.route, amount=stats.sql_seconds)
+            if stats.statements:
+                statement, count = stats.statements.most_common(1)[0]
+                if count > N_PLUS_ONE_THRESHOLD:
+                    N_PLUS_ONE.inc(stats.route)
+                    logger.warning(
+                        "Possible N+1 on %s %s: statement ran %d times: %s",
+                        method, stats.route, count, " ".join(statement.split())[:200],
+                    )
+
+def compiled_cache_stats() -> dict:
+    """
+    Compiled-statement cache outcomes since startup, from each execution's
+    public context.cache_hit (see _after_cursor_execute).
+    """
+    outcomes = {result: int(count) for (result,), count in COMPILED_CACHE.values().items()}
+    return {
+        "hits": outcomes.get("cache_hit", 0),
+        "misses": outcomes.get("cache_miss", 0),
+        "uncached": sum(count for result, count in outcomes.items() if result not in ("cache_hit", "cache_miss")),
+    }
+
+def render(extra_gauges=()) -> str:
+    """
+    All metrics in Prometheus text exposition format. extra_gauges is an
+    iterable of (name, help, [(labels, value), ...]) for values owned elsewhere.
+    """
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUESTS, QUERIES_PER_REQUEST, SQL_TIME, POOL_WAIT, SLOW_QUERIES, N_PLUS_ONE, COMPILED_CACHE):
+        lines.extend(metric.render())
+    lines.extend(_gauges(
+        "taskflow_db_slow_query_sample_seconds",
+        "Most recent slow statements (bounded sample).",
+        [({"route": route, "statement_id": statement_id}, elapsed) for route, statement_id, elapsed in list(_slow_samples)],
+    ))
+    for name, help_text, samples in extra_gauges:
+        lines.extend(_gauges(name, help_text, samples))
+    return "\n".join(lines) + "\n"
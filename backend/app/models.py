@@ -1,5 +1,6 @@
 # your_project/models.py
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import DDL, event
+from sqlalchemy import Column, Integer, String, Boolean, Date, Float, ForeignKey, DateTime, Index, UniqueConstraint, false, func
 from sqlalchemy.orm import relationship # Import relationship
 from datetime import datetime # Import datetime for default value
 from .database import Base
@@ -10,6 +11,11 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_admin = Column(Boolean, default=False)
+    # Case-folded email for the assignee typeahead (GET /users/search): a
+    # prefix becomes a range scan that returns matches already in rank order
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email)),
+    )
     # Optional: Add backrefs to tasks
     # assigned_tasks = relationship("Task", foreign_keys="[Task.assignedTo]", back_populates="assigned_to_user")
     # created_tasks = relationship("Task", foreign_keys="[Task.owner_id]", back_populates="owner_user")
@@ -27,7 +33,128 @@ class Task(Base):
     dueDate = Column(DateTime, nullable=True) # Add due date
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Position of the task's last change in commit order (see TaskChangeCounter)
+    change_seq = Column(Integer, nullable=True)
 
     # Define relationships
     assigned_to_user = relationship("User", foreign_keys=[assignedTo], backref="assigned_tasks_rel")
-    owner_user = relationship("User", foreign_keys=[owner_id], backref="created_tasks_rel")
\ No newline at end of file
+    owner_user = relationship("User", foreign_keys=[owner_id], backref="created_tasks_rel")
+
+    # Composite indexes for keyset-paginated listings and the owner/assignee
+    # visibility filter. Existing databases get them via migrate_db.py.
+    __table_args__ = (
+        Index("ix_tasks_owner_id_id", "owner_id", "id"),
+        Index("ix_tasks_assignedTo_id", "assignedTo", "id"),
+        Index("ix_tasks_status_dueDate", "status", "dueDate"),
+        Index("ix_tasks_change_seq", "change_seq"), # Delta sync watermark
+        Index("ix_tasks_dueDate_id", "dueDate", "id"), # Due-date scheduler window loads
+        # Without AUTOINCREMENT SQLite hands out max(id) + 1, which can be an id
+        # already moved to tasks_archive; migrate_db.py rebuilds older tables
+        {"sqlite_autoincrement": True},
+    )
+
+
+class ArchivedTask(Base):
+    # Cold tier: tasks completed long ago, moved out of `tasks` by archive.py
+    # so the active table and its indexes stay small. Same columns and ids as
+    # Task; read-only, and only read when a request passes include_archived.
+    __tablename__ = "tasks_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    status = Column(String)
+    priority = Column(String)
+    assignedTo = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id"))
+    dueDate = Column(DateTime, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_tasks_archive_owner_id_id", "owner_id", "id"),
+        Index("ix_tasks_archive_assignedTo_id", "assignedTo", "id"),
+    )
+
+
+class TaskDeletion(Base):
+    # Tombstones for hard-deleted tasks, so delta sync clients can drop them.
+    # owner_id/assignedTo are kept to scope tombstones like the task itself.
+    __tablename__ = "task_deletions"
+    id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=True, index=True) # From TaskChangeCounter; the sync watermark
+    task_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=True, index=True)
+    assignedTo = Column(Integer, nullable=True, index=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+    # The task still exists but was reassigned away from `assignedTo`, who can no longer see it
+    visibility_lost = Column(Boolean, nullable=False, default=False, server_default=false())
+
+
+
+class TaskChangeCounter(Base):
+    # Single row handing out delta sync sequence numbers. Every transaction
+    # that writes tasks or tombstones increments it just before committing;
+    # the row lock is held until commit, so numbers are taken in commit order
+    # and a cursor never skips a change committed late (an updated_at
+    # timestamp, taken from the app clock before commit, can).
+    __tablename__ = "task_change_counter"
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+event.listen(TaskChangeCounter.__table__, "after_create", DDL("INSERT INTO task_change_counter (id, value) VALUES (1, 0)"))
+
+class TaskEvent(Base):
+    # Append-only history of status and assignee changes (see history.py).
+    # from_status is NULL when the task was created, to_status when it was deleted.
+    __tablename__ = "task_events"
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=True)
+    from_assignee = Column(Integer, nullable=True)
+    to_assignee = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_events_task_id_id", "task_id", "id"),
+    )
+
+
+class TaskStatusDaily(Base):
+    # Per-day, per-status rollup of task_events, maintained incrementally
+    __tablename__ = "task_status_daily"
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    entered = Column(Integer, nullable=False, default=0)
+    exited = Column(Integer, nullable=False, default=0)
+    age_seconds = Column(Float, nullable=False, default=0) # Summed task ages on entering the status
+
+
+class TaskAssigneeDaily(Base):
+    # Per-assignee, per-day rollup; keyed assignee first for one user's trend
+    __tablename__ = "task_assignee_daily"
+    assignee_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    assigned = Column(Integer, nullable=False, default=0)
+    unassigned = Column(Integer, nullable=False, default=0) # Reassigned away or deleted
+    completed = Column(Integer, nullable=False, default=0)
+    cycle_seconds = Column(Float, nullable=False, default=0) # Summed created-to-completed times
+
+
+class Notification(Base):
+    # Due-date reminders and overdue notices written by the scheduler.
+    # The unique constraint makes writes idempotent across workers and restarts.
+    __tablename__ = "notifications"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False) # "reminder" or "overdue"
+    due_at = Column(DateTime, nullable=False) # The dueDate the notice was raised for
+    created_at = Column(DateTime, default=datetime.utcnow)
+    read_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("task_id", "user_id", "kind", "due_at", name="uq_notifications_task_user_kind_due"),
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+    )
@@ -0,0 +1,56 @@
+# your_project/pagination.py
+import base64
+import json
+import os
+from typing import Optional
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Keyset pagination: the cursor is the last row's id, wrapped in an opaque
+# url-safe token so clients don't depend on its shape.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Server-side cap on `limit` for list endpoints. Larger requests get a full
+# page of this size plus a cursor, so one request can't pull a whole table.
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+def page_size(limit: int) -> int:
+    return max(0, min(limit, MAX_PAGE_SIZE))
+
+def encode_token(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_token(token: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return payload
+
+def encode_cursor(last_id: int) -> str:
+    return encode_token({"id": last_id})
+
+def decode_cursor(token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    try:
+        return int(decode_token(token)["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+def next_cursor(page: list, limit: int) -> Optional[str]:
+    # A short page means there is nothing after it
+    if limit <= 0 or len(page) < limit:
+        return None
+    return encode_cursor(page[-1].id)
@@ -0,0 +1,173 @@
+# your_project/response_cache.py
+import json
+import logging
+import os
+import threading
+from typing import Iterable, NamedTuple, Optional
+from dotenv import load_dotenv
+
+from .cache import TTLCache
+from .database import READ_AFTER_WRITE_SECONDS, is_replica_session
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Read-through cache for GET /tasks/ and GET /tasks/{id} response bodies.
+# Entries are keyed by visibility scope ("admin" for all admins, "user:<id>"
+# otherwise) plus the request parameters. Each scope has a generation number
+# that is part of the key; a task write bumps the generations of the scopes
+# that can see the task, so their old entries are never read again and age
+# out of the LRU. Set RESPONSE_CACHE_URL (redis://...) to share entries and
+# generations between workers; RESPONSE_CACHE_TTL=0 disables the cache.
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "4096"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_PREFIX = os.getenv("RESPONSE_CACHE_PREFIX", "taskflow:responses")
+
+ADMIN_SCOPE = "admin"
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict
+
+def scope_for(user) -> str:
+    return ADMIN_SCOPE if user.is_admin else f"user:{user.id}"
+
+class LocalBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict = {}
+        self._lock = threading.Lock()
+
+    def generation(self, scope: str) -> int:
+        return self._generations.get(scope, 0)
+
+    def bump(self, scopes: Iterable[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        self.entries.set(key, value, ttl=ttl)
+
+    def stats(self) -> dict:
+        return {"backend": "local", **self.entries.stats()}
+
+class RedisBackend:
+    """
+    Entries and generations live in a Redis-compatible server, so a write on
+    one worker invalidates the cached reads of all of them. Redis errors are
+    logged and treated as misses; the database stays the source of truth.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("RESPONSE_CACHE_URL is set but the 'redis' package is not installed.")
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, scope: str) -> int:
+        try:
+            return int(self._client.get(f"{self.prefix}:gen:{scope}") or 0)
+        except Exception:
+            logger.exception("Response cache generation lookup failed")
+            return -1 # Never stored under, so the read falls through to the database
+
+    def bump(self, scopes: Iterable[str]) -> None:
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for scope in scopes:
+                pipe.incr(f"{self.prefix}:gen:{scope}")
+            pipe.execute()
+        except Exception:
+            # Stale entries can't be dropped; they still expire after RESPONSE_CACHE_TTL
+            logger.exception("Response cache invalidation failed")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            raw = self._client.get(f"{self.prefix}:{key}")
+        except Exception:
+            logger.exception("Response cache read failed")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        headers, body = raw.split(b"\n", 1)
+        return CachedResponse(body, json.loads(headers))
+
+    def set(self, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        try:
+            raw = json.dumps(value.headers).encode() + b"\n" + value.body
+            self._client.set(f"{self.prefix}:{key}", raw, px=int(ttl * 1000))
+        except Exception:
+            logger.exception("Response cache write failed")
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses}
+
+class ResponseCache:
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def lookup(self, user, namespace: str, params) -> tuple:
+        """
+        Return (key, cached response or None). The key captures the scope's
+        generation *before* the caller queries the database, so a result that
+        races with a write is stored under an already-invalidated key.
+        """
+        if not self.enabled:
+            return None, None
+        scope = scope_for(user)
+        generation = self.backend.generation(scope)
+        if generation < 0:
+            return None, None
+        key = f"{scope}:{generation}:{namespace}:{params}"
+        return key, self.backend.get(key)
+
+    def store(self, key: Optional[str], body: bytes, headers: Optional[dict] = None, ttl: Optional[float] = None) -> None:
+        if key is not None:
+            self.backend.set(key, CachedResponse(body, headers or {}), ttl)
+
+    def invalidate(self, user_ids: Iterable[Optional[int]]) -> None:
+        # Admins see every task, so every write invalidates the admin scope too
+        if self.enabled:
+            self.backend.bump([ADMIN_SCOPE] + [f"user:{user_id}" for user_id in set(user_ids) if user_id is not None])
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.backend.stats()}
+
+def _make_backend():
+    if RESPONSE_CACHE_URL:
+        return RedisBackend(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL, RESPONSE_CACHE_PREFIX)
+    return LocalBackend(RESPONSE_CACHE_MAXSIZE, RESPONSE_CACHE_TTL)
+
+response_cache = ResponseCache(_make_backend(), enabled=RESPONSE_CACHE_TTL > 0)
+
+def invalidate_task_events(task_events: Iterable[dict]) -> None:
+    """
+    Drop cached reads for every scope that could see the tasks in these
+    events.task_event payloads: owner, assignee, previous assignee and admins.
+    """
+    user_ids = set()
+    for event in task_events:
+        user_ids.update((event["owner_id"], event["assignedTo"], event["previous_assignedTo"]))
+    if user_ids:
+        response_cache.invalidate(user_ids)
+
+def ttl_for(db) -> Optional[float]:
+    # A replica read can predate the write that last invalidated its scope,
+    # so responses served from the replica are kept only briefly
+    return READ_AFTER_WRITE_SECONDS if is_replica_session(db) else None
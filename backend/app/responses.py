@@ -0,0 +1,35 @@
+# your_project/responses.py
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+# orjson is optional: it serializes plain dicts/lists with datetimes several
+# times faster than the stdlib, which matters on 1,000-row list pages.
+try:
+    import orjson
+except ImportError: # pragma: no cover - depends on the environment
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+def rows_to_dicts(rows) -> list:
+    # Row tuples from a column projection -> plain dicts, no per-row model instances
+    return [row._asdict() for row in rows]
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse for content that is already plain JSON-compatible data
+    (dicts/lists of str, int, bool, None, datetime). Uses orjson when installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
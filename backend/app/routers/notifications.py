@@ -0,0 +1,41 @@
+# your_project/routers/notifications.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from .. import schemas, crud
+from ..database import get_db, get_read_db
+from ..dependencies import get_current_user
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["Notifications"]
+)
+
+@router.get("/", response_model=List[schemas.Notification])
+def read_notifications(
+    before: Optional[int] = None,
+    limit: int = 50,
+    unread_only: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Due-date reminders and overdue notices for the current user, newest first.
+    Pass the id of the last notification as `before` to fetch older ones.
+    """
+    return crud.get_notifications(db, user_id=current_user.id, before_id=before, limit=min(limit, 200), unread_only=unread_only)
+
+@router.post("/{notification_id}/read", response_model=schemas.Notification)
+def mark_notification_read(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Mark one of the current user's notifications as read.
+    """
+    db_notification = crud.mark_notification_read(db, user_id=current_user.id, notification_id=notification_id)
+    if db_notification is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return db_notification
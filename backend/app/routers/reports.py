@@ -0,0 +1,60 @@
+# your_project/routers/reports.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+
+from .. import schemas, crud
+from ..database import get_read_db
+from ..dependencies import get_current_user, get_current_admin_user
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"]
+)
+
+DEFAULT_RANGE_DAYS = 90
+
+def _date_range(start: Optional[date], end: Optional[date]):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+    return start, end
+
+@router.get("/status-trend", response_model=List[schemas.StatusTrendPoint])
+def read_status_trend(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    db: Session = Depends(get_read_db),
+    current_admin: schemas.UserInDB = Depends(get_current_admin_user)
+):
+    """
+    Status flow, throughput and average cycle time per day, week or month (admin only).
+    Defaults to the last 90 days. Served from the daily rollups, not the raw history.
+    """
+    start, end = _date_range(start, end)
+    return crud.get_status_trend(db, start, end, bucket)
+
+@router.get("/assignee-trend", response_model=List[schemas.AssigneeTrendPoint])
+def read_assignee_trend(
+    assignee_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Assignments, completions and average cycle time of one assignee per period.
+    Defaults to the current user; only admins can look at other users.
+    """
+    assignee_id = current_user.id if assignee_id is None else assignee_id
+    if assignee_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view other users' reports"
+        )
+    start, end = _date_range(start, end)
+    return crud.get_assignee_trend(db, assignee_id, start, end, bucket)
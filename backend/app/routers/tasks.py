@@ -1,10 +1,19 @@
 # your_project/routers/tasks.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+import json
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 
-from .. import schemas, crud, models
-from ..database import get_db
+from .. import schemas, crud, models, events, transfer, write_queue
+from ..database import get_db, get_read_db, read_session
+from ..errors import NotFound
+from ..http_cache import etag_response
+from ..response_cache import response_cache, ttl_for
+from ..responses import json_dumps, rows_to_dicts
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, decode_token, encode_token, next_cursor, page_size
 from ..dependencies import get_current_user, get_current_admin_user # Import admin dependency as well
 
 router = APIRouter(
@@ -12,6 +21,8 @@ router = APIRouter(
     tags=["Tasks"]
 )
 
+MAX_BULK_ITEMS = 1000
+
 # You'll need to define a Task and TaskCreate schema in schemas.py first.
 # For demonstration, let's assume a basic Task schema for now.
 # Please ensure your schemas.py contains these:
@@ -49,6 +60,64 @@ router = APIRouter(
 #     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# --- Authorization rules shared by the single-task and bulk endpoints ---
+def update_denied_reason(db_task: models.Task, task_update: schemas.TaskUpdate, current_user) -> Optional[str]:
+    if current_user.is_admin:
+        return None
+    if db_task.owner_id != current_user.id and db_task.assignedTo != current_user.id:
+        return "Not authorized to update this task."
+    # Specific rule for regular users: cannot reassign to others
+    if task_update.assignedTo is not None and \
+       task_update.assignedTo != db_task.assignedTo and \
+       task_update.assignedTo != current_user.id: # Allow re-assigning to self
+        return "Regular users cannot reassign tasks to others."
+    return None
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    # `fields=id,status,priority` -> Task field names in schema order; id is always kept for cursors
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - schemas.Task.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown task fields: {', '.join(sorted(unknown))}"
+        )
+    return [name for name in schemas.Task.model_fields if name in requested or name == "id"]
+
+# expand= names -> the task column holding the user's id
+EXPANDABLE = {"owner": "owner_id", "assignee": "assignedTo"}
+
+def parse_expand(expand: Optional[str]) -> List[str]:
+    # `expand=owner,assignee` -> related users to embed as {id, email}
+    if not expand:
+        return []
+    requested = [name.strip() for name in expand.split(",") if name.strip()]
+    unknown = set(requested) - EXPANDABLE.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expansions: {', '.join(sorted(unknown))}"
+        )
+    return [name for name in EXPANDABLE if name in requested]
+
+def expand_users(db: Session, tasks: List[dict], expand: List[str]) -> List[dict]:
+    # One users query per page, however many tasks it holds
+    if not expand or not tasks:
+        return tasks
+    users = crud.get_user_summaries(db, [task[EXPANDABLE[name]] for task in tasks for name in expand])
+    for task in tasks:
+        for name in expand:
+            task[name] = users.get(task[EXPANDABLE[name]])
+    return tasks
+
+def delete_denied_reason(db_task: models.Task, current_user) -> Optional[str]:
+    if not current_user.is_admin and db_task.owner_id != current_user.id:
+        return "Not authorized to delete this task."
+    return None
+
+
 @router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
 def create_task(
     task: schemas.TaskCreate,
@@ -58,40 +127,315 @@ def create_task(
     """
     Create a new task.
     """
-    return crud.create_user_task(db=db, task=task, owner_id=current_user.id)
+    return write_queue.run(db, crud.create_user_task, task=task, owner_id=current_user.id)
 
-@router.get("/", response_model=List[schemas.Task])
+@router.get("/", response_model=List[schemas.TaskExpanded])
 def read_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    after: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    assignedTo: Optional[int] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
     current_user: schemas.UserInDB = Depends(get_current_user)
 ):
     """
-    Retrieve all tasks.
+    Retrieve all tasks, ordered by id.
     Admins can see all tasks. Regular users can only see tasks they created or are assigned to.
+    Optional filters: status, priority, assignedTo, due date range and full-text `q`
+    over title and description.
+    `fields` (e.g. `id,status,priority,assignedTo`) returns only those fields; `id` is always included.
+    `expand=owner,assignee` embeds `{id, email}` summaries of the related users.
+    `include_archived=true` also returns tasks moved to the archive tier, merged in id order.
+    Pass the X-Next-Cursor header of a page as `after` to fetch the next one.
+    `limit` is capped at MAX_PAGE_SIZE.
     """
+    # Served from the per-scope response cache until a visible task changes
+    cache_key, cached = response_cache.lookup(current_user, "tasks", sorted(request.query_params.multi_items()))
+    if cached is not None:
+        return etag_response(request, cached.body, headers=cached.headers)
+
+    limit = page_size(limit)
+    after_id = decode_cursor(after)
+    expansions = parse_expand(expand)
+    # Expanded users are looked up by their id columns, so a sparse fieldset keeps those
+    columns = parse_fields(",".join([fields] + [EXPANDABLE[name] for name in expansions]) if fields else None)
+    filters = schemas.TaskFilter(
+        status=status_filter, priority=priority, assignedTo=assignedTo,
+        due_after=due_after, due_before=due_before, q=q,
+    )
+    # Column projection + plain dicts: no ORM entities or per-row models on this hot path
     if current_user.is_admin:
-        tasks = crud.get_tasks(db, skip=skip, limit=limit)
+        tasks = crud.get_tasks(db, skip=skip, limit=limit, after_id=after_id, filters=filters, rows=True, fields=columns,
+                               include_archived=include_archived)
     else:
         # For regular users, retrieve tasks they created or are assigned to
-        tasks = db.query(models.Task).filter(
-            (models.Task.owner_id == current_user.id) |
-            (models.Task.assignedTo == current_user.id)
-        ).offset(skip).limit(limit).all()
-    return tasks
+        tasks = crud.get_visible_tasks(db, user_id=current_user.id, skip=skip, limit=limit, after_id=after_id, filters=filters, rows=True, fields=columns,
+                                         include_archived=include_archived)
+    cursor = next_cursor(tasks, limit)
+    headers = {NEXT_CURSOR_HEADER: cursor} if cursor else None
+    body = json_dumps(expand_users(db, rows_to_dicts(tasks), expansions))
+    response_cache.store(cache_key, body, headers, ttl=ttl_for(db))
+    return etag_response(request, body, headers=headers)
+
+@router.get("/stats", response_model=schemas.TaskStats)
+def read_task_stats(
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Aggregate task counts by status, priority, assignee and creation month.
+    Admins get stats over all tasks. Regular users only over tasks they created or are assigned to.
+    """
+    return crud.get_task_stats(
+        db,
+        user_id=None if current_user.is_admin else current_user.id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+@router.get("/changes", response_model=schemas.TaskChanges)
+def read_task_changes(
+    request: Request,
+    since: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Delta sync: tasks created or updated and ids of tasks deleted since the `since` cursor.
+    Omit `since` for a full sync. Keep calling with the returned cursor while `has_more` is true.
+    Regular users only receive changes to tasks they created or are assigned to.
+    """
+    limit = page_size(limit)
+    watermark = decode_token(since) if since else {}
+    try:
+        # Cursors from before the commit-ordered watermark ("t"/"i"/"d") restart from the beginning
+        since_seq = int(watermark.get("s", 0))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    tasks, deletions, since_seq, has_more = crud.get_task_changes(
+        db,
+        user_id=None if current_user.is_admin else current_user.id,
+        since_seq=since_seq,
+        limit=limit,
+    )
+    changes = schemas.TaskChanges(
+        tasks=tasks,
+        deleted=[deletion.task_id for deletion in deletions],
+        cursor=encode_token({"s": since_seq}),
+        has_more=has_more,
+    )
+    return etag_response(request, changes.model_dump_json().encode())
+
+@router.get("/events")
+async def stream_task_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of task changes (task.created / task.updated / task.deleted,
+    and id-only task.archived when archive.py moves a completed task to the archive).
+    Regular users only receive events for tasks they own or are assigned to, plus an id-only
+    `task.removed` when a task is reassigned away from them.
+    A `resync` event means events were dropped because the client fell behind.
+    """
+    # Release the connection get_current_user may have used; the stream can stay open for hours
+    db.close()
+    subscription = events.broker.subscribe(current_user.id, current_user.is_admin)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=events.EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/bulk", response_model=schemas.TaskBulkResponse)
+def bulk_tasks(
+    operations: schemas.TaskBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Create, update and delete many tasks in one transaction.
+    Each item is authorized with the same rules as the single-task endpoints; items that
+    are not found or not allowed are reported in the results and skipped.
+    """
+    total = len(operations.create) + len(operations.update) + len(operations.delete)
+    if total > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_ITEMS} operations per request."
+        )
+
+    # One query for every task referenced by an update or delete
+    existing = crud.get_tasks_by_ids(db, [u.id for u in operations.update] + operations.delete)
+
+    results = [
+        schemas.TaskBulkResult(op="create", index=i, status_code=status.HTTP_201_CREATED)
+        for i in range(len(operations.create))
+    ]
+    updates, update_results = [], []
+    for i, item in enumerate(operations.update):
+        result = schemas.TaskBulkResult(op="update", index=i, id=item.id, status_code=status.HTTP_200_OK)
+        db_task = existing.get(item.id)
+        denied = None if db_task is None else update_denied_reason(db_task, item, current_user)
+        if db_task is None:
+            result.status_code, result.detail = status.HTTP_404_NOT_FOUND, "Task not found"
+        elif denied:
+            result.status_code, result.detail = status.HTTP_403_FORBIDDEN, denied
+        else:
+            updates.append((item.id, item.model_dump(exclude_unset=True, exclude={"id"})))
+            update_results.append(result)
+        results.append(result)
+
+    delete_ids = []
+    for i, task_id in enumerate(operations.delete):
+        result = schemas.TaskBulkResult(op="delete", index=i, id=task_id, status_code=status.HTTP_204_NO_CONTENT)
+        db_task = existing.get(task_id)
+        denied = None if db_task is None else delete_denied_reason(db_task, current_user)
+        if db_task is None:
+            result.status_code, result.detail = status.HTTP_404_NOT_FOUND, "Task not found"
+        elif denied:
+            result.status_code, result.detail = status.HTTP_403_FORBIDDEN, denied
+        else:
+            delete_ids.append(task_id)
+        results.append(result)
+
+    try:
+        created, updated = write_queue.run(
+            db,
+            crud.bulk_apply_tasks,
+            creates=operations.create,
+            owner_id=current_user.id,
+            updates=updates,
+            delete_ids=delete_ids,
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk operation violates a database constraint; no changes were applied."
+        )
+    for result, db_task in zip(results, created):
+        result.id, result.task = db_task.id, schemas.Task.model_validate(db_task)
+    for result in update_results:
+        if result.id in updated:
+            result.task = schemas.Task.model_validate(updated[result.id])
+        else:
+            # Deleted by another request after it was authorized above
+            result.status_code, result.detail = status.HTTP_404_NOT_FOUND, "Task not found"
+    return {"results": results}
+
+@router.get("/export")
+def export_tasks(
+    request: Request,
+    format: str = "ndjson",
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    assignedTo: Optional[int] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    q: Optional[str] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Stream every visible task as NDJSON (default) or CSV, ordered by id.
+    Accepts the same filters as GET /tasks/. Rows are written as they are read,
+    so exports of any size run in constant memory. With `include_archived=true`
+    archived tasks follow the active ones.
+    """
+    fmt = transfer.format_for(None, format)
+    filters = schemas.TaskFilter(
+        status=status_filter, priority=priority, assignedTo=assignedTo,
+        due_after=due_after, due_before=due_before, q=q,
+    )
+    user_id = None if current_user.is_admin else current_user.id
+    # The stream outlives the request's session, so it opens (and closes) its own
+    db.close()
+
+    def stream():
+        export_db = read_session(request)
+        try:
+            rows = crud.iter_task_rows(export_db, user_id, filters, batch_size=transfer.EXPORT_BATCH_SIZE,
+                                       include_archived=include_archived)
+            yield from transfer.export_rows(rows, fmt)
+        finally:
+            export_db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=transfer.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"'},
+    )
+
+@router.post("/import", response_model=schemas.TaskImportReport)
+def import_tasks(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Create tasks from an NDJSON or CSV upload (format taken from `format` or the
+    file extension). The current user becomes the owner. Valid rows are inserted in
+    fixed-size transactions; invalid rows are skipped and reported by line number.
+    CSV exports from GET /tasks/export can be imported as-is.
+    """
+    fmt = transfer.format_for(file.filename, format)
+    # Uploads are spooled to disk, so this reads one record at a time
+    records = transfer.iter_records(file.file, fmt)
+    return transfer.import_tasks(db, records, owner_id=current_user.id)
 
-@router.get("/{task_id}", response_model=schemas.Task)
+@router.get("/{task_id}", response_model=schemas.TaskExpanded)
 def read_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    include_archived: bool = False,
+    expand: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: schemas.UserInDB = Depends(get_current_user)
 ):
     """
     Retrieve a specific task by ID.
     Admins can see any task. Regular users can only see tasks they created or are assigned to.
+    With `include_archived=true`, tasks moved to the archive tier are found too (read-only).
+    `expand=owner,assignee` embeds `{id, email}` summaries of the related users.
     """
+    expansions = parse_expand(expand)
+    # Only visible tasks are cached, so a hit needs no authorization check
+    cache_key, cached = response_cache.lookup(current_user, "task", (task_id, include_archived, expansions))
+    if cached is not None:
+        return etag_response(request, cached.body)
+
     db_task = crud.get_task(db, task_id=task_id)
+    if db_task is None and include_archived:
+        db_task = crud.get_archived_task(db, task_id=task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -102,7 +446,13 @@ def read_task(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this task"
         )
-    return db_task
+    task = schemas.Task.model_validate(db_task)
+    if expansions:
+        body = json_dumps(expand_users(db, [task.model_dump()], expansions)[0])
+    else:
+        body = task.model_dump_json().encode()
+    response_cache.store(cache_key, body, ttl=ttl_for(db))
+    return etag_response(request, body)
 
 
 @router.put("/{task_id}", response_model=schemas.Task)
@@ -121,28 +471,16 @@ def update_task(
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Authorization check
-    if not current_user.is_admin and \
-       db_task.owner_id != current_user.id and \
-       db_task.assignedTo != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this task."
-        )
-
-    # Specific rule for regular users: cannot reassign to others
-    if not current_user.is_admin and \
-       task_update.assignedTo is not None and \
-       task_update.assignedTo != db_task.assignedTo and \
-       task_update.assignedTo != current_user.id: # Allow re-assigning to self
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Regular users cannot reassign tasks to others."
-        )
+    denied = update_denied_reason(db_task, task_update, current_user)
+    if denied:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=denied)
 
     # Need to add an `update_task` function in crud.py
     # Example: crud.update_task(db: Session, db_task: models.Task, task_update: schemas.TaskCreate)
-    updated_task = crud.update_task(db=db, db_task=db_task, task_update_data=task_update.model_dump(exclude_unset=True))
+    try:
+        updated_task = write_queue.run(db, crud.update_task, db_task=db_task, task_update_data=task_update.model_dump(exclude_unset=True))
+    except NotFound: # Deleted while queued for the writer
+        raise HTTPException(status_code=404, detail="Task not found")
     return updated_task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -159,11 +497,12 @@ def delete_task(
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if not current_user.is_admin and db_task.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this task."
-        )
+    denied = delete_denied_reason(db_task, current_user)
+    if denied:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=denied)
 
-    crud.delete_task(db, task_id=task_id)
+    try:
+        write_queue.run(db, crud.delete_task, task_id=task_id, db_task=db_task)
+    except NotFound: # Deleted while queued for the writer
+        raise HTTPException(status_code=404, detail="Task not found")
     return {"detail": "Task deleted successfully"}
\ No newline at end of file
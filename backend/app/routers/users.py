@@ -1,11 +1,16 @@
 # your_project/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from .. import schemas, crud, models
-from ..database import get_db
+from .. import schemas, crud, models, write_queue
+from ..cache import USER_SEARCH_CACHE_TTL, user_search_cache
+from ..database import get_db, get_read_db
+from ..errors import NotFound
 from ..dependencies import get_current_user, get_current_admin_user
+from ..hashing import get_password_hash_sync
+from ..pagination import page_size
+from ..responses import FastJSONResponse, rows_to_dicts
 
 router = APIRouter(
     prefix="/users",
@@ -21,7 +26,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db_user = crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    return write_queue.run(db, crud.create_user, user=user, hashed_password=get_password_hash_sync(user.password))
 
 # Keep the `users/me` endpoint here as it's user-specific
 @router.get("/me/", response_model=schemas.UserInDB)
@@ -32,24 +37,43 @@ async def read_users_me(current_user: schemas.UserInDB = Depends(get_current_use
     return current_user
 
 # Move the admin-only endpoint to get all users here
-@router.get("/", response_model=List[schemas.UserInDB])
+@router.get("/", response_model=List[schemas.UserInDB], response_class=FastJSONResponse)
 def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: schemas.UserInDB = Depends(get_current_admin_user) # Admin-only
 ):
     """
-    Get a list of all users (admin only).
+    Get a list of all users (admin only). `limit` is capped at MAX_PAGE_SIZE.
     """
-    users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+    users = crud.get_users(db, skip=skip, limit=page_size(limit), rows=True)
+    # Already shaped like UserInDB; returning a Response skips per-row validation
+    return FastJSONResponse(rows_to_dicts(users))
+
+# Declared before /{user_id} so "search" isn't parsed as an id
+@router.get("/search", response_model=List[schemas.UserSummary], response_class=FastJSONResponse)
+def search_users(
+    prefix: str = Query("", max_length=254),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    """
+    Assignee typeahead: users whose email starts with `prefix` (case-insensitive), best matches first.
+    """
+    key = (prefix.lower(), limit)
+    users = user_search_cache.get(key)
+    if users is None:
+        users = rows_to_dicts(crud.search_users(db, prefix=prefix, limit=limit))
+        user_search_cache.set(key, users)
+    return FastJSONResponse(users, headers={"Cache-Control": f"private, max-age={int(USER_SEARCH_CACHE_TTL)}"})
 
 # Move the admin-only endpoint to get a single user by ID here
 @router.get("/{user_id}", response_model=schemas.UserInDB)
 def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: schemas.UserInDB = Depends(get_current_admin_user) # Admin-only
 ):
     """
@@ -76,7 +100,14 @@ def update_user(
 
     # Need to add an `update_user` function in crud.py
     # Example: crud.update_user(db: Session, db_user: models.User, user_update_data: dict)
-    updated_user = crud.update_user(db=db, db_user=db_user, user_update_data=user_update.model_dump(exclude_unset=True))
+    user_update_data = user_update.model_dump(exclude_unset=True)
+    if user_update_data.get("password"):
+        # Hashed here rather than in crud so the write queue's writer never waits on bcrypt
+        user_update_data["hashed_password"] = get_password_hash_sync(user_update_data.pop("password"))
+    try:
+        updated_user = write_queue.run(db, crud.update_user, db_user=db_user, user_update_data=user_update_data)
+    except NotFound: # Deleted while queued for the writer
+        raise HTTPException(status_code=404, detail="User not found")
     return updated_user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -91,5 +122,5 @@ def delete_user(
     db_user = crud.get_user_by_id(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    crud.delete_user(db, user_id=user_id)
+    write_queue.run(db, crud.delete_user, user_id=user_id)
     return {"detail": "User deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,253 @@
+# your_project/scheduler.py
+import asyncio
+import heapq
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from dotenv import load_dotenv
+
+from . import crud, events
+from .database import SessionLocal
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Due-date reminders and overdue notices, raised by a background task in the
+# app lifespan. Open tasks due within the horizon sit in a min-heap keyed by
+# fire time; the window is loaded and extended with range queries on
+# ix_tasks_dueDate_id, and task changes arrive through the task event feed,
+# so each change costs O(log n) and nothing ever scans the whole table.
+# Safe to run in every worker: notices are unique per task, user, kind and
+# due date (uq_notifications_task_user_kind_due) and crud.create_notifications
+# skips existing ones, so each is stored and announced once.
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+REMINDER_LEAD_MINUTES = float(os.getenv("REMINDER_LEAD_MINUTES", "60"))
+SCHEDULER_HORIZON_MINUTES = float(os.getenv("SCHEDULER_HORIZON_MINUTES", str(24 * 60)))
+# After a start or resync, notices that fell due this recently are still raised
+SCHEDULER_CATCHUP_MINUTES = float(os.getenv("SCHEDULER_CATCHUP_MINUTES", "60"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "500"))
+SCHEDULER_FLUSH_SECONDS = float(os.getenv("SCHEDULER_FLUSH_SECONDS", "1"))
+SCHEDULER_RETRY_SECONDS = 5.0
+
+REMINDER, OVERDUE = "reminder", "overdue"
+TASK_CHANGES = ("task.created", "task.updated", "task.deleted")
+
+def _as_naive_utc(value) -> Optional[datetime]:
+    # dueDate is stored as naive UTC; events carry it as an ISO string
+    if value is None:
+        return None
+    due = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if due.tzinfo is not None:
+        due = due.astimezone(timezone.utc).replace(tzinfo=None)
+    return due
+
+class DueDateScheduler:
+    def __init__(self, lead: timedelta, horizon: timedelta, catchup: timedelta, batch_size: int, flush_seconds: float):
+        self.lead = lead
+        self.horizon = horizon
+        self.catchup = catchup
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._heap: list = [] # (fire_at, task_id, kind, due); stale entries are skipped when popped
+        self._due: dict = {} # task_id -> dueDate of each tracked open task
+        self._loaded_until = datetime.min
+        self._pending: list = [] # (task_id, kind, due) fired but not yet persisted
+        self._flush_at: Optional[datetime] = None
+        self._resync = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._subscription = None
+        self._runners: list = []
+        self.fired = 0
+        self.persisted = 0
+        self.reloads = 0
+
+    # --- Heap maintenance (event loop thread only) ---
+    def _track(self, task_id: int, due: datetime, now: datetime) -> None:
+        if self._due.get(task_id) == due or due < now - self.catchup:
+            return
+        self._due[task_id] = due
+        if due > now:
+            heapq.heappush(self._heap, (due - self.lead, task_id, REMINDER, due))
+        heapq.heappush(self._heap, (due, task_id, OVERDUE, due))
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 4 * len(self._due) + 1024:
+            self._heap = [entry for entry in self._heap if self._due.get(entry[1]) == entry[3]]
+            heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def apply_event(self, event: dict) -> None:
+        if event["type"] == "resync":
+            # The feed dropped events, so the heap may have missed changes
+            self._resync = True
+            self._wakeup.set()
+            return
+        if event["type"] not in TASK_CHANGES:
+            return
+        task = event["task"]
+        due = _as_naive_utc(task.get("dueDate"))
+        if event["type"] == "task.deleted" or task.get("status") == "completed" or due is None or due > self._loaded_until:
+            # Due dates past the loaded window are picked up when it's extended
+            self._due.pop(task["id"], None)
+        else:
+            self._track(task["id"], due, datetime.utcnow())
+
+    def _pop_due(self, now: datetime) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, task_id, kind, due = heapq.heappop(self._heap)
+            if self._due.get(task_id) != due:
+                continue
+            if kind == OVERDUE:
+                del self._due[task_id]
+            self._pending.append((task_id, kind, due))
+            self.fired += 1
+            if self._flush_at is None:
+                self._flush_at = now + timedelta(seconds=self.flush_seconds)
+
+    # --- Database work (runs in a worker thread) ---
+    def _load_window(self, after: datetime, until: datetime) -> list:
+        rows, after_due, after_id = [], after, 0
+        with SessionLocal() as db:
+            while True:
+                chunk = crud.get_tasks_due_between(db, after_due, after_id, until, limit=self.batch_size)
+                rows.extend((row.id, row.dueDate) for row in chunk)
+                if len(chunk) < self.batch_size:
+                    return rows
+                after_due, after_id = chunk[-1].dueDate, chunk[-1].id
+
+    def _persist(self, batch: list) -> list:
+        """
+        Re-check the batch against the database (changes made on other workers
+        may not have reached this heap), insert one notification per recipient
+        and return events for the ones that weren't already raised.
+        """
+        with SessionLocal() as db:
+            tasks = crud.get_open_tasks_due_info(db, [task_id for task_id, _, _ in batch])
+            notifications = []
+            for task_id, kind, due in batch:
+                task = tasks.get(task_id)
+                if task is None or task.dueDate != due:
+                    continue
+                for user_id in {task.owner_id, task.assignedTo} - {None}:
+                    notifications.append({"user_id": user_id, "task_id": task_id, "kind": kind, "due_at": due})
+            inserted = crud.create_notifications(db, notifications) if notifications else []
+        self.persisted += len(inserted)
+        raised = []
+        for task_id, kind in dict.fromkeys((row.task_id, row.kind) for row in inserted):
+            task = tasks[task_id]
+            raised.append({
+                "type": f"task.{kind}",
+                "task": {"id": task.id, "title": task.title, "dueDate": task.dueDate.isoformat()},
+                "owner_id": task.owner_id,
+                "assignedTo": task.assignedTo,
+                "previous_assignedTo": None,
+            })
+        return raised
+
+    # --- Loop ---
+    async def _extend(self, until: datetime) -> None:
+        after = self._loaded_until
+        # Advance first: changes arriving during the load are tracked directly
+        # and win over the (possibly older) rows the load returns
+        self._loaded_until = until
+        try:
+            rows = await asyncio.to_thread(self._load_window, after, until)
+        except Exception:
+            self._resync = True # Part of the window is missing; rebuild it on the next try
+            raise
+        now = datetime.utcnow()
+        for task_id, due in rows:
+            if task_id not in self._due:
+                self._track(task_id, due, now)
+
+    async def _reload(self) -> None:
+        self._resync = False
+        self._heap.clear()
+        self._due.clear()
+        now = datetime.utcnow()
+        self._loaded_until = now - self.catchup
+        self.reloads += 1
+        await self._extend(now + self.horizon)
+
+    async def _flush(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            for event in await asyncio.to_thread(self._persist, batch):
+                events.publish(event)
+        self._flush_at = None
+
+    def _next_wakeup(self, now: datetime) -> float:
+        deadlines = [self._loaded_until - self.horizon / 2]
+        if self._heap:
+            deadlines.append(self._heap[0][0])
+        if self._flush_at is not None:
+            deadlines.append(self._flush_at)
+        return max(0.0, (min(deadlines) - now).total_seconds())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = datetime.utcnow()
+                if self._resync or self._loaded_until == datetime.min:
+                    await self._reload()
+                elif now + self.horizon / 2 >= self._loaded_until:
+                    await self._extend(now + self.horizon)
+                self._pop_due(now)
+                if len(self._pending) >= self.batch_size or (self._flush_at is not None and now >= self._flush_at):
+                    await self._flush()
+                timeout = self._next_wakeup(datetime.utcnow())
+            except Exception:
+                logger.exception("Due-date scheduler iteration failed")
+                timeout = SCHEDULER_RETRY_SECONDS
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _consume(self) -> None:
+        while True:
+            event = await self._subscription.get(timeout=events.EVENTS_HEARTBEAT_SECONDS)
+            if event is not None:
+                self.apply_event(event)
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        # Sees every task change, including other workers' when a shared broker is configured
+        self._subscription = events.broker.subscribe(user_id=0, is_admin=True)
+        self._runners = [asyncio.create_task(self._run()), asyncio.create_task(self._consume())]
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+        if self._subscription is not None:
+            events.broker.unsubscribe(self._subscription)
+            self._subscription = None
+        try:
+            await self._flush()
+        except Exception:
+            logger.exception("Failed to persist pending notifications on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._runners),
+            "tracked_tasks": len(self._due),
+            "heap_size": len(self._heap),
+            "pending": len(self._pending),
+            "fired": self.fired,
+            "persisted": self.persisted,
+            "reloads": self.reloads,
+            "loaded_until": self._loaded_until.isoformat() if self._loaded_until != datetime.min else None,
+        }
+
+scheduler = DueDateScheduler(
+    lead=timedelta(minutes=REMINDER_LEAD_MINUTES),
+    horizon=timedelta(minutes=SCHEDULER_HORIZON_MINUTES),
+    catchup=timedelta(minutes=SCHEDULER_CATCHUP_MINUTES),
+    batch_size=SCHEDULER_BATCH_SIZE,
+    flush_seconds=SCHEDULER_FLUSH_SECONDS,
+)
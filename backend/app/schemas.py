@@ -1,7 +1,7 @@
 # your_project/schemas.py
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -17,6 +17,11 @@ class UserInDB(UserBase):
     class Config:
         from_attributes = True
 
+class UserSummary(BaseModel):
+    # Typeahead result: just enough to show and assign a user
+    id: int
+    email: str
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -51,6 +56,11 @@ class Task(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskExpanded(Task):
+    # Present only when requested with `expand=owner,assignee`
+    owner: Optional[UserSummary] = None
+    assignee: Optional[UserSummary] = None
+
 # Optional: For updating tasks, you might want a schema
 class TaskUpdate(TaskBase):
     title: Optional[str] = None
@@ -58,4 +68,93 @@ class TaskUpdate(TaskBase):
     status: Optional[str] = None
     priority: Optional[str] = None
     assignedTo: Optional[int] = None
-    dueDate: Optional[datetime] = None
\ No newline at end of file
+    dueDate: Optional[datetime] = None
+
+class TaskFilter(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assignedTo: Optional[int] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    q: Optional[str] = None # Full-text search over title and description
+
+class TaskChanges(BaseModel):
+    tasks: List[Task] # Created or updated since the cursor, oldest first
+    deleted: List[int] # Ids of tasks deleted (or reassigned away from the caller) since the cursor
+    cursor: str # Pass back as `since` on the next call
+    has_more: bool
+
+# --- Bulk Task Schemas ---
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+class TaskBulkRequest(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[TaskBulkUpdate] = []
+    delete: List[int] = []
+
+class TaskBulkResult(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int # Position of the item within its operation list
+    id: Optional[int] = None
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[Task] = None
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkResult]
+
+# --- Task Import Schemas ---
+class TaskImportError(BaseModel):
+    line: int # 1-based line (CSV: physical line the record ended on)
+    errors: List[str]
+
+class TaskImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportError] # Capped; `failed` has the full count
+
+# --- Task Statistics Schemas ---
+class AssigneeTaskStats(BaseModel):
+    assignedTo: Optional[int] = None # None groups unassigned tasks
+    total: int
+    by_status: Dict[str, int]
+
+class MonthlyTaskStats(BaseModel):
+    month: str # "YYYY-MM" of created_at
+    total: int
+    by_status: Dict[str, int]
+
+class TaskStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: List[AssigneeTaskStats]
+    by_month: List[MonthlyTaskStats]
+
+# --- Notification Schemas ---
+class Notification(BaseModel):
+    id: int
+    task_id: int
+    kind: Literal["reminder", "overdue"]
+    due_at: datetime
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# --- Report Schemas ---
+class StatusTrendPoint(BaseModel):
+    period: str # "YYYY-MM-DD", "YYYY-Www" or "YYYY-MM" depending on bucket
+    entered: Dict[str, int]
+    exited: Dict[str, int]
+    completed: int
+    avg_cycle_hours: Optional[float] = None # Created-to-completed, for tasks completed in the period
+
+class AssigneeTrendPoint(BaseModel):
+    period: str
+    assigned: int
+    unassigned: int
+    completed: int
+    avg_cycle_hours: Optional[float] = None
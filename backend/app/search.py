@@ -0,0 +1,79 @@
+# your_project/search.py
+import re
+from sqlalchemy import DDL, event, func, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+from . import models
+
+# Full-text search over task title + description.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# PostgreSQL: a GIN index on the same tsvector expression used in queries.
+# Other backends fall back to a LIKE scan.
+FTS_TABLE = "tasks_fts"
+PG_TS_CONFIG = "simple"
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, description, content='tasks', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_tasks_fulltext ON tasks USING GIN "
+    f"(to_tsvector('{PG_TS_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, '')))",
+]
+
+# Created together with the tasks table by metadata.create_all
+for statement in SQLITE_DDL:
+    event.listen(models.Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_DDL:
+    event.listen(models.Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+def install_fulltext(engine):
+    """
+    Create the full-text index on an existing tasks table and (re)build it.
+    Safe to run repeatedly.
+    """
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif engine.dialect.name == "postgresql":
+            for statement in POSTGRES_DDL:
+                connection.execute(text(statement))
+
+def _pg_document():
+    # Must match the indexed expression exactly for the GIN index to be used
+    return func.to_tsvector(
+        literal_column(f"'{PG_TS_CONFIG}'"),
+        func.coalesce(models.Task.title, literal_column("''"))
+        .concat(literal_column("' '"))
+        .concat(func.coalesce(models.Task.description, literal_column("''"))),
+    )
+
+def _fts5_query(q: str) -> str:
+    # Quote each word so user input can't hit FTS5 syntax; trailing * gives prefix matches
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", q))
+
+def text_match(db: Session, q: str, model=models.Task):
+    """
+    SQL condition matching tasks whose title or description contains all words of `q`.
+    The archive tier (model=ArchivedTask) has no full-text index and always uses LIKE.
+    """
+    dialect = db.get_bind().dialect.name if model is models.Task else None
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return models.Task.id.is_(None)
+        matching_ids = select(literal_column("rowid")).select_from(text(FTS_TABLE)) \
+            .where(text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=match))
+        return models.Task.id.in_(matching_ids)
+    if dialect == "postgresql":
+        return _pg_document().bool_op("@@")(func.plainto_tsquery(literal_column(f"'{PG_TS_CONFIG}'"), q))
+    pattern = f"%{q}%"
+    return or_(model.title.ilike(pattern), model.description.ilike(pattern))
@@ -0,0 +1,109 @@
+# your_project/transfer.py
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Optional
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import crud, schemas, write_queue
+from .responses import json_dumps
+
+# Streaming task export/import. Exports iterate a server-side cursor and
+# write rows as they arrive; imports parse one record at a time and insert
+# in fixed-size transactions, so memory stays flat for any file size.
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+def format_for(name: Optional[str], explicit: Optional[str] = None) -> str:
+    fmt = explicit or (name.rsplit(".", 1)[-1].lower() if name and "." in name else None)
+    if fmt == "jsonl":
+        fmt = "ndjson"
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format; use one of {', '.join(FORMATS)}.")
+    return fmt
+
+# --- Export ---
+def export_rows(rows: Iterable[dict], fmt: str) -> Iterator[bytes]:
+    if fmt == "ndjson":
+        for row in rows:
+            yield json_dumps(row) + b"\n"
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in crud.TASK_COLUMNS])
+    for i, row in enumerate(rows, 1):
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row.values()])
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+# --- Import ---
+def iter_records(fileobj: BinaryIO, fmt: str) -> Iterator[tuple]:
+    """
+    Yield (line_number, record) pairs, reading the file incrementally.
+    Unparseable lines yield (line_number, error message) instead of a dict.
+    """
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    if fmt == "ndjson":
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_number, f"Invalid JSON: {exc}"
+                continue
+            yield line_number, record if isinstance(record, dict) else "Expected a JSON object"
+        return
+    reader = csv.DictReader(text)
+    for record in reader:
+        # Empty CSV cells mean "not set"
+        yield reader.line_num, {key: value for key, value in record.items() if key and value != ""}
+
+def import_tasks(db: Session, records: Iterable[tuple], owner_id: int, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Validate records as TaskCreate and insert the valid ones in batches of
+    batch_size rows, one transaction per batch. Returns an import report.
+    """
+    report = {"imported": 0, "failed": 0, "errors": []}
+
+    def fail(line_number, errors):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_number, "errors": errors})
+
+    def flush(batch):
+        try:
+            write_queue.run(db, crud.bulk_apply_tasks, creates=[task for _, task in batch], owner_id=owner_id, updates=[], delete_ids=[])
+            report["imported"] += len(batch)
+        except IntegrityError:
+            # The batch was rolled back as a whole; earlier batches stay committed
+            for line_number, _ in batch:
+                fail(line_number, ["Batch violates a database constraint; its rows were not imported."])
+
+    batch = []
+    for line_number, record in records:
+        if isinstance(record, str):
+            fail(line_number, [record])
+            continue
+        try:
+            batch.append((line_number, schemas.TaskCreate.model_validate(record)))
+        except ValidationError as exc:
+            fail(line_number, [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()])
+            continue
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return report
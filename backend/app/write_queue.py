@@ -0,0 +1,240 @@
+# your_project/write_queue.py
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextvars import ContextVar
+from typing import Any, Callable, NamedTuple, Optional
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, sessionmaker
+from dotenv import load_dotenv
+
+from . import database
+from .errors import NotFound, ServerBusy
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Optional write pipeline. With WRITE_QUEUE_ENABLED, mutating routes hand
+# their crud call to a single writer thread instead of opening their own
+# write transaction. The writer drains whatever is queued (up to
+# WRITE_QUEUE_MAX_BATCH operations), runs each one in a SAVEPOINT of one
+# transaction and commits once, so concurrent writers stop fighting over the
+# SQLite lock and a slow fsync is paid per batch instead of per request.
+# A failing operation only rolls back its own savepoint.
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+# How long the writer waits for more operations after the first one (0 = only take what is already queued)
+WRITE_QUEUE_MAX_WAIT_MS = float(os.getenv("WRITE_QUEUE_MAX_WAIT_MS", "0"))
+# Operations allowed to wait for the writer before new ones are rejected with 503
+WRITE_QUEUE_MAX_PENDING = int(os.getenv("WRITE_QUEUE_MAX_PENDING", "1024"))
+WRITE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("WRITE_QUEUE_TIMEOUT_SECONDS", "30"))
+
+# Post-commit callbacks of the operation the writer is running (None outside the writer)
+_deferred: ContextVar[Optional[list]] = ContextVar("write_queue_deferred", default=None)
+
+class _Operation(NamedTuple):
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    future: Future
+
+class BatchSession(Session):
+    """
+    Session of the writer thread. While an operation runs, crud's commit()
+    only flushes and rollback() only rolls back the operation's savepoint;
+    the writer commits the whole batch at the end.
+    """
+
+    def commit(self):
+        if self.info.get("savepoint") is not None:
+            self.flush()
+        else:
+            super().commit()
+
+    def rollback(self):
+        savepoint = self.info.get("savepoint")
+        if savepoint is not None:
+            if savepoint.is_active:
+                savepoint.rollback()
+        else:
+            super().rollback()
+
+# The writer has a connection of its own. Sharing database.engine's pool would
+# deadlock once every pooled connection belongs to a request waiting on the writer.
+writer_engine = database.make_engine(database.DATABASE_URL, pool_size=1, max_overflow=0)
+# expire_on_commit=False: results are read by the callers after the writer has closed the session
+BatchSessionLocal = sessionmaker(class_=BatchSession, bind=writer_engine, autoflush=False, expire_on_commit=False)
+
+def after_commit(fn: Callable, *args) -> None:
+    # Runs fn now, or after the batch commits when called from an operation on the writer
+    deferred = _deferred.get()
+    if deferred is None:
+        fn(*args)
+    else:
+        deferred.append((fn, args))
+
+def _rebind(db: Session, value: Any) -> Any:
+    # ORM objects loaded by the request's session are reloaded in the writer's by primary key
+    state = inspect(value, raiseerr=False)
+    if state is None or not hasattr(state, "identity") or state.identity is None:
+        return value
+    instance = db.get(type(value), state.identity)
+    if instance is None:
+        raise NotFound(f"{type(value).__name__} not found")
+    return instance
+
+class WriteQueue:
+    def __init__(self, max_batch: int, max_wait: float, max_pending: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[_Operation]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.operations = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def submit(self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None) -> Future:
+        future: Future = Future()
+        op = _Operation(fn, args, kwargs or {}, future)
+        try:
+            self._queue.put_nowait(op)
+        except queue.Full:
+            self.rejected += 1
+            raise ServerBusy("Server is busy, please retry shortly")
+        return future
+
+    def _collect(self, first: _Operation) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                op = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                # Stop requested: finish this batch, then exit
+                self._queue.put(None)
+                break
+            batch.append(op)
+        return batch
+
+    def _apply(self, batch: list) -> None:
+        done = []
+        db = BatchSessionLocal()
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite would only BEGIN at the first DML, after our first
+                # SAVEPOINT; take the write lock up front instead
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for op in batch:
+                if not op.future.set_running_or_notify_cancel():
+                    continue
+                savepoint = db.begin_nested()
+                db.info["savepoint"] = savepoint
+                token = _deferred.set([])
+                try:
+                    result = op.fn(db, *[_rebind(db, arg) for arg in op.args],
+                                   **{key: _rebind(db, value) for key, value in op.kwargs.items()})
+                    if savepoint.is_active:
+                        savepoint.commit()
+                    done.append((op, result, _deferred.get()))
+                except BaseException as exc:
+                    if savepoint.is_active:
+                        savepoint.rollback()
+                    self.failed += 1
+                    op.future.set_exception(exc)
+                finally:
+                    _deferred.reset(token)
+                    db.info["savepoint"] = None
+            db.commit()
+        except BaseException as exc:
+            logger.exception("Write queue batch of %d operations failed to commit", len(batch))
+            db.rollback()
+            # Operations applied so far are lost with the transaction
+            for op in batch:
+                if not op.future.done():
+                    self.failed += 1
+                    op.future.set_exception(exc)
+            return
+        finally:
+            db.close()
+        for op, result, callbacks in done:
+            # Cache invalidation and change events, now that the data is visible
+            for fn, args in callbacks:
+                try:
+                    fn(*args)
+                except Exception:
+                    logger.exception("Write queue post-commit callback failed")
+            op.future.set_result(result)
+        self.batches += 1
+        self.operations += len(done)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            self._apply(self._collect(op))
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        # Queued operations are still applied before the writer exits
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            writer_engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.running,
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "operations": self.operations,
+            "avg_batch_size": round(self.operations / self.batches, 2) if self.batches else 0,
+            "max_batch_seen": self.max_batch_seen,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+writer = WriteQueue(WRITE_QUEUE_MAX_BATCH, WRITE_QUEUE_MAX_WAIT_MS / 1000, WRITE_QUEUE_MAX_PENDING)
+
+def run(db: Session, fn: Callable, *args, **kwargs):
+    """
+    Call the crud write `fn(db, *args, **kwargs)`: directly on the request's
+    session, or on the writer's session when the write queue is running.
+    """
+    if not writer.running:
+        return fn(db, *args, **kwargs)
+    # End the request's read transaction so its pooled connection isn't held
+    # while we wait. Rolled back, not committed: the writer owns the write, and
+    # a caller's stray pending changes must not be committed on the side. ORM
+    # arguments keep their identity and are reloaded by the writer.
+    if db.new or db.dirty or db.deleted:
+        raise RuntimeError("write_queue.run() needs a session without pending changes")
+    db.rollback()
+    future = writer.submit(fn, args, kwargs)
+    try:
+        return future.result(timeout=WRITE_QUEUE_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        if future.cancel():
+            raise ServerBusy("Server is busy, please retry shortly")
+        # Already being applied; its outcome is imminent
+        return future.result()
@@ -0,0 +1,17 @@
+# Move tasks completed more than N days ago into the archive tier (tasks_archive).
+# Usage: python archive_tasks.py --older-than-days 30
+# The app can do the same in the background with ARCHIVE_ENABLED=true.
+
+from app import archive
+import argparse
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive long-completed tasks.")
+    parser.add_argument("--older-than-days", type=float, default=archive.ARCHIVE_AFTER_DAYS,
+                        help="archive tasks completed (last updated) more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=archive.ARCHIVE_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--pause", type=float, default=archive.ARCHIVE_PAUSE_SECONDS, help="seconds to wait between batches")
+    args = parser.parse_args()
+
+    total = archive.archive_completed(args.older_than_days, args.batch_size, args.pause)
+    print(f"Archived {total} tasks.")
@@ -0,0 +1,179 @@
+# Reproducible in-process API benchmark. Requests go straight to the FastAPI
+# app over ASGI (httpx.ASGITransport), so there is no network or server
+# process in the measurement.
+#
+#   python -m benchmarks.bench_api --sizes 1000 10000 --requests 200
+#   python -m benchmarks.bench_api --compare benchmarks/results/<older>.json
+#
+# Each run seeds a throwaway SQLite database with seed_db's generator (fixed
+# --seed, so datasets are identical between runs), grows it to every size in
+# --sizes, and reports p50/p95/p99 latency and throughput per operation.
+# Results are written to benchmarks/results/<timestamp>-<commit>.json.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("FRONTEND_ORIGIN", "http://localhost")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+import httpx
+from sqlalchemy import func, select
+
+import seed_db
+from app import database, models
+from app.main import app
+
+PASSWORD = "password"
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, elapsed):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+    }
+
+async def run_operation(client, make_request, n, concurrency):
+    """
+    Issue n requests built by make_request(i) with at most `concurrency` in flight.
+    """
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return summarize(latencies, time.perf_counter() - start)
+
+async def bench_size(client, user_emails, task_ids, args, rng):
+    async def token_for(email):
+        response = await client.post("/token", data={"username": email, "password": PASSWORD})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    admin = await token_for("admin@gmail.com")
+    regular = await token_for(user_emails[0])
+    n = args.requests
+    picks = rng.sample(task_ids, min(len(task_ids), 2 * n))
+    get_ids, doomed_ids = picks[:n], picks[n:]
+
+    operations = {
+        "login": (max(1, n // 10), lambda i: ("POST", "/token", {"data": {"username": rng.choice(user_emails), "password": PASSWORD}})),
+        "list_admin": (n, lambda i: ("GET", "/tasks/", {"params": {"limit": args.page_size}, "headers": admin})),
+        "list_user": (n, lambda i: ("GET", "/tasks/", {"params": {"limit": args.page_size}, "headers": regular})),
+        "get": (len(get_ids), lambda i: ("GET", f"/tasks/{get_ids[i]}", {"headers": admin})),
+        "update": (len(get_ids), lambda i: ("PUT", f"/tasks/{get_ids[i]}", {"json": {"status": rng.choice(("pending", "in-progress", "completed"))}, "headers": admin})),
+        "delete": (len(doomed_ids), lambda i: ("DELETE", f"/tasks/{doomed_ids[i]}", {"headers": admin})),
+    }
+    results = {}
+    for name, (count, make_request) in operations.items():
+        if count:
+            results[name] = await run_operation(client, make_request, count, args.concurrency)
+            row = results[name]
+            print(f"  {name:<11} n={row['requests']:<5} p50={row['p50_ms']:8.2f}ms p95={row['p95_ms']:8.2f}ms "
+                  f"p99={row['p99_ms']:8.2f}ms {row['throughput_rps']:8.1f} req/s")
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')}): p95 change")
+    for size, operations in current["results"].items():
+        for name, row in operations.items():
+            old = baseline["results"].get(size, {}).get(name)
+            if old and old["p95_ms"]:
+                delta = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+                print(f"  size={size:<8} {name:<11} {old['p95_ms']:8.2f}ms -> {row['p95_ms']:8.2f}ms ({delta:+.1f}%)")
+
+async def main():
+    parser = argparse.ArgumentParser(description="In-process API latency/throughput benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="task counts to benchmark at")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200, help="requests per operation")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    database.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    try:
+        seed_db.create_demo_users(db)
+        user_ids = seed_db.generate_users(db, args.users, password=PASSWORD, rng=rng)
+    finally:
+        db.close()
+    user_emails = [seed_db.SYNTHETIC_EMAIL.format(user_id) for user_id in user_ids]
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "args": vars(args),
+        "results": {},
+    }
+    task_ids = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in sorted(args.sizes):
+                db = database.SessionLocal()
+                try:
+                    # Grow the dataset (earlier sizes' delete runs removed some rows)
+                    existing = db.scalar(select(func.count(models.Task.id)))
+                    if size > existing:
+                        seed_db.generate_tasks(db, user_ids, size - existing, rng=rng)
+                    task_ids = list(db.scalars(select(models.Task.id)))
+                finally:
+                    db.close()
+                print(f"tasks={size}")
+                report["results"][str(size)] = await bench_size(client, user_emails, task_ids, args, rng)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['commit']}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\nSaved {path}")
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    asyncio.run(main())
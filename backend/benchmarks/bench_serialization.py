@@ -0,0 +1,86 @@
+# Microbenchmark: task list serialization, ORM + Pydantic + stdlib json
+# (the response_model path) vs column projection + plain dicts + orjson.
+#
+#   python -m benchmarks.bench_serialization [--tasks 5000] [--repeat 20]
+#
+# Runs against a throwaway SQLite file, never the configured DATABASE_URL.
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("FRONTEND_ORIGIN", "http://localhost")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from app import crud, database, models, schemas
+from app.responses import json_dumps, orjson, rows_to_dicts
+
+def seed(n_tasks: int):
+    models.Base.metadata.create_all(bind=database.engine)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+            "status": ("pending", "in-progress", "completed")[i % 3],
+            "priority": ("low", "medium", "high", "urgent")[i % 4],
+            "assignedTo": 1 + i % 50,
+            "owner_id": 1 + i % 7,
+            "dueDate": now + timedelta(days=i % 90),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(n_tasks)
+    ]
+    with database.engine.begin() as connection:
+        connection.execute(insert(models.Task), rows)
+
+task_list = TypeAdapter(list[schemas.Task])
+
+def current_path(db, limit: int) -> bytes:
+    # What FastAPI does for response_model=List[schemas.Task] with ORM rows
+    tasks = crud.get_tasks(db, limit=limit)
+    validated = task_list.validate_python(tasks, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+def fast_path(db, limit: int) -> bytes:
+    return json_dumps(rows_to_dicts(crud.get_tasks(db, limit=limit, rows=True)))
+
+def measure(fn, limit: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        db = database.SessionLocal()
+        try:
+            start = time.perf_counter()
+            fn(db, limit)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.tasks)
+    print(f"orjson: {'yes' if orjson is not None else 'no (stdlib json fallback)'}")
+    print(f"{'page size':>10} {'current ms':>12} {'fast ms':>10} {'speedup':>8}")
+    for limit in (100, 1000, args.tasks):
+        current = measure(current_path, limit, args.repeat)
+        fast = measure(fast_path, limit, args.repeat)
+        print(f"{limit:>10} {current:>12.2f} {fast:>10.2f} {current / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
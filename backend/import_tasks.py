@@ -0,0 +1,35 @@
+# Import tasks from an NDJSON or CSV file (e.g. one written by GET /tasks/export).
+# Usage: python import_tasks.py tasks.ndjson --owner admin@gmail.com
+
+from app import crud, database, transfer
+from fastapi import HTTPException
+import argparse
+import sys
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import tasks from an NDJSON or CSV file.")
+    parser.add_argument("path")
+    parser.add_argument("--owner", required=True, help="email of the user who will own the imported tasks")
+    parser.add_argument("--format", choices=transfer.FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=transfer.IMPORT_BATCH_SIZE, help="rows per transaction")
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        owner = crud.get_user_by_email(db, args.owner)
+        if owner is None:
+            sys.exit(f"No user with email {args.owner}.")
+        try:
+            fmt = transfer.format_for(args.path, args.format)
+        except HTTPException as exc:
+            sys.exit(exc.detail)
+        with open(args.path, "rb") as f:
+            report = transfer.import_tasks(db, transfer.iter_records(f, fmt), owner_id=owner.id, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Imported {report['imported']} tasks, {report['failed']} failed.")
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {'; '.join(error['errors'])}")
+    if report["failed"] > len(report["errors"]):
+        print(f"  ... and {report['failed'] - len(report['errors'])} more")
@@ -0,0 +1,140 @@
+# Brings an existing database up to the current models.
+# create_all only creates missing tables, so columns and indexes added to
+# models on already existing tables are created here (idempotently).
+
+import warnings
+from sqlalchemy import exc, func, inspect, select, update
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from sqlalchemy.orm import Session
+from app import database, history, models, search
+
+def add_missing_columns(engine):
+    # New columns must be nullable or carry a server default to be added in place
+    inspector = inspect(engine)
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(f"ALTER TABLE {engine.dialect.identifier_preparer.format_table(table)} ADD COLUMN {ddl}")
+                print(f"Added column {column.name} to {table.name}")
+
+def enable_task_autoincrement(engine):
+    # Tasks tables created before sqlite_autoincrement was declared reuse
+    # max(id) + 1, which may be an archived id. SQLite can't add AUTOINCREMENT
+    # in place, so the table is rebuilt (its indexes and full-text triggers
+    # are recreated by the steps after this one) and the id sequence starts
+    # past every id ever used, archived ones included.
+    if engine.dialect.name != "sqlite":
+        return
+    table = models.Task.__table__
+    with engine.connect() as conn:
+        ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'").scalar()
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return
+    preparer = engine.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(column.name) for column in table.columns)
+    create = str(CreateTable(table).compile(dialect=engine.dialect)).replace("CREATE TABLE tasks ", "CREATE TABLE tasks_rebuild ", 1)
+    # One script in an explicit transaction: the driver would otherwise
+    # commit the DDL statements one by one
+    connection = engine.raw_connection()
+    try:
+        connection.driver_connection.executescript(f"""
+            BEGIN;
+            {create};
+            INSERT INTO tasks_rebuild ({columns}) SELECT {columns} FROM tasks;
+            DROP TABLE tasks;
+            ALTER TABLE tasks_rebuild RENAME TO tasks;
+            INSERT INTO sqlite_sequence (name, seq)
+                SELECT 'tasks', 0 WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'tasks');
+            UPDATE sqlite_sequence SET seq = max(seq, (SELECT coalesce(max(id), 0) FROM tasks_archive)) WHERE name = 'tasks';
+            COMMIT;
+        """)
+    finally:
+        connection.close() # Rolls back if the script stopped halfway
+    print("Rebuilt tasks with AUTOINCREMENT ids")
+
+def create_missing_indexes(engine):
+    inspector = inspect(engine)
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        with warnings.catch_warnings():
+            # SQLite can't reflect expression indexes (ix_users_email_lower) and leaves them out
+            warnings.filterwarnings("ignore", "Skipped unsupported reflection", exc.SAWarning)
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                with engine.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                print(f"Ensured index {index.name} on {table.name}")
+
+def backfill_change_seqs(engine, batch_size=5000):
+    # Delta sync orders changes by change_seq/seq. Rows written before those
+    # columns existed get numbers after the counter's current value (tombstones
+    # first, then tasks by last update), and the counter moves past them.
+    # Cursors handed out before this upgrade restart from zero anyway.
+    with Session(engine) as db:
+        counter = db.get(models.TaskChangeCounter, 1)
+        if counter is None:
+            counter = models.TaskChangeCounter(id=1, value=0)
+            db.add(counter)
+        seq, total = counter.value, 0
+        for model, column, order in (
+            (models.TaskDeletion, models.TaskDeletion.seq, (models.TaskDeletion.id,)),
+            (models.Task, models.Task.change_seq, (models.Task.updated_at, models.Task.id)),
+        ):
+            ids = db.scalars(select(model.id).where(column.is_(None)).order_by(*order)).all()
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                db.execute(update(model), [{"id": row_id, column.key: seq + i + 1} for i, row_id in enumerate(batch)])
+                seq += len(batch)
+            total += len(ids)
+        counter.value = seq
+        db.commit()
+    if total:
+        print(f"Numbered {total} tasks and tombstones for delta sync")
+    with engine.begin() as conn:
+        # Served the (updated_at, id) watermark change_seq replaced
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_updated_at_id")
+
+def backfill_history_rollups(engine, batch_size=5000):
+    # Databases that predate task_events have no history, so seed the daily
+    # rollups from current rows instead: every task is taken to have been
+    # created at created_at, and completed ones to have been completed at
+    # updated_at. Runs only while the rollups are still empty.
+    with Session(engine) as db:
+        if db.scalar(select(func.count()).select_from(models.TaskStatusDaily)):
+            return
+        columns = (models.Task.id, models.Task.status, models.Task.assignedTo, models.Task.created_at, models.Task.updated_at)
+        changes, total = [], 0
+        for task_id, status, assignee, created_at, updated_at in db.execute(select(*columns).execution_options(yield_per=batch_size)):
+            if status == history.COMPLETED:
+                changes.append(history.task_change(task_id, created_at, None, "pending", None, assignee, created_at))
+                changes.append(history.task_change(task_id, created_at, "pending", status, assignee, assignee, updated_at or created_at))
+            else:
+                changes.append(history.task_change(task_id, created_at, None, status, None, assignee, created_at))
+            total += 1
+            if len(changes) >= batch_size:
+                history.fold(db, changes)
+                changes = []
+        if changes:
+            history.fold(db, changes)
+        db.commit()
+    if total:
+        print(f"Backfilled history rollups from {total} tasks")
+
+def upgrade(engine=database.engine):
+    models.Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    enable_task_autoincrement(engine)
+    create_missing_indexes(engine)
+    backfill_change_seqs(engine)
+    search.install_fulltext(engine)
+    backfill_history_rollups(engine)
+
+if __name__ == "__main__":
+    upgrade()
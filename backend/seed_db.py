@@ -1,7 +1,11 @@
 # D:\Prasaar Tech\task-main\backend\seed_db.py
 
-from app import crud, schemas, database # This line is correct if seed_db.py is OUTSIDE the 'app' directory
+from app import crud, schemas, database, models # This line is correct if seed_db.py is OUTSIDE the 'app' directory
+from sqlalchemy import insert, select, func
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import argparse
+import random
 
 def create_demo_users(db: Session):
     admin_email = "admin@gmail.com"
@@ -24,9 +28,87 @@ def create_demo_users(db: Session):
     else:
         print(f"Regular user {user_email} already exists.")
 
+# --- Synthetic data for load testing ---
+STATUS_WEIGHTS = {"pending": 40, "in-progress": 25, "completed": 35}
+PRIORITY_WEIGHTS = {"low": 25, "medium": 45, "high": 22, "urgent": 8}
+SYNTHETIC_EMAIL = "loaduser{}@example.com"
+
+def generate_users(db: Session, n_users: int, password: str = "password", admin_ratio: float = 0.02,
+                   batch_size: int = 5000, rng: random.Random = None):
+    """
+    Insert n_users synthetic users in batches. All share one bcrypt hash, so
+    this costs a single hash instead of one per user. Returns the new user ids.
+    """
+    rng = rng or random.Random(0)
+    hashed_password = crud.get_password_hash(password)
+    start = (db.scalar(select(func.max(models.User.id))) or 0) + 1
+    for offset in range(0, n_users, batch_size):
+        rows = [
+            {"email": SYNTHETIC_EMAIL.format(start + i), "hashed_password": hashed_password,
+             "is_admin": rng.random() < admin_ratio}
+            for i in range(offset, min(offset + batch_size, n_users))
+        ]
+        db.execute(insert(models.User), rows)
+        db.commit()
+    return list(db.scalars(select(models.User.id).where(models.User.id >= start).order_by(models.User.id)))
+
+def generate_tasks(db: Session, user_ids: list, n_tasks: int, batch_size: int = 5000,
+                   rng: random.Random = None, now: datetime = None):
+    """
+    Insert n_tasks synthetic tasks in batches of batch_size rows per transaction.
+    Ownership is Zipf-like (a few users create most tasks), ~80% of tasks are
+    assigned, created_at spans the last 180 days and due dates fall 1-30 days later.
+    """
+    rng = rng or random.Random(0)
+    now = now or datetime.utcnow()
+    owner_weights = [1 / rank for rank in range(1, len(user_ids) + 1)]
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    for offset in range(0, n_tasks, batch_size):
+        count = min(batch_size, n_tasks - offset)
+        owners = rng.choices(user_ids, weights=owner_weights, k=count)
+        rows = []
+        seqs = iter(crud.next_change_seqs(db, count)) # So delta sync clients receive them
+        for i, owner_id in enumerate(owners):
+            created_at = now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+            status = rng.choices(statuses, weights=status_weights)[0]
+            rows.append({
+                "title": f"Task {offset + i + 1}: {rng.choice(('Fix', 'Review', 'Write', 'Plan', 'Ship'))} "
+                         f"{rng.choice(('login flow', 'report', 'invoice', 'release notes', 'dashboard'))}",
+                "description": rng.choice((None, "Follow up with the client and update the tracker.",
+                                           "Blocked on review; see the linked discussion.")),
+                "status": status,
+                "priority": rng.choices(priorities, weights=priority_weights)[0],
+                "assignedTo": rng.choice(user_ids) if rng.random() < 0.8 else None,
+                "owner_id": owner_id,
+                "dueDate": created_at + timedelta(days=rng.randint(1, 30)),
+                "created_at": created_at,
+                "updated_at": min(now, created_at + timedelta(hours=rng.randint(0, 240))),
+                "change_seq": next(seqs),
+            })
+        db.execute(insert(models.Task), rows)
+        db.commit()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed demo users, optionally plus synthetic load-test data.")
+    parser.add_argument("--users", type=int, default=0, help="synthetic users to create")
+    parser.add_argument("--tasks", type=int, default=0, help="synthetic tasks to create")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for reproducible datasets")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=database.engine)
     db = database.SessionLocal()
     try:
         create_demo_users(db)
+        rng = random.Random(args.seed)
+        user_ids = []
+        if args.users:
+            user_ids = generate_users(db, args.users, batch_size=args.batch_size, rng=rng)
+            print(f"Created {len(user_ids)} synthetic users")
+        if args.tasks:
+            user_ids = user_ids or list(db.scalars(select(models.User.id)))
+            generate_tasks(db, user_ids, args.tasks, batch_size=args.batch_size, rng=rng)
+            print(f"Created {args.tasks} synthetic tasks")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,63 @@
+# The app reads its settings at import time, so they are set here, before
+# any test module imports it. Every test session gets a fresh SQLite file
+# (or the empty database in TEST_DATABASE_URL, e.g. a Postgres one).
+import os
+import random
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("SECRET_KEY", "test")
+# Deterministic query counts: no cached principals or responses, no background jobs
+os.environ["AUTH_CACHE_TTL"] = "0"
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+os.environ["USER_SEARCH_CACHE_TTL"] = "0"
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ["ARCHIVE_ENABLED"] = "false"
+os.environ["WRITE_QUEUE_ENABLED"] = "false"
+
+SEED_USERS = 200
+SEED_TASKS = 5000
+
+@pytest.fixture(scope="session")
+def seeded():
+    """
+    Synthetic users and tasks from seed_db's generator, for the query plan and
+    count checks (tests/test_queries.py), with fresh planner statistics.
+    """
+    from sqlalchemy import select
+
+    import seed_db
+    from app import database, models
+
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    try:
+        seed_db.create_demo_users(db)
+        user_ids = seed_db.generate_users(db, SEED_USERS, rng=random.Random(0))
+        seed_db.generate_tasks(db, user_ids, SEED_TASKS, rng=random.Random(0))
+        user_email = db.get(models.User, user_ids[0]).email
+        # Pending tasks, so the status changes made by the checks always record history
+        task_ids = list(db.scalars(
+            select(models.Task.id).where(models.Task.status == "pending").order_by(models.Task.id).limit(200)
+        ))
+        # Both assigned (so the assignee rollup is written) to someone other than their owner and
+        # the new assignee: the first keeps its assignee, the second is reassigned and gets a tombstone
+        update_id, reassign_id = db.scalars(
+            select(models.Task.id).where(
+                models.Task.status == "pending", models.Task.id.not_in(task_ids),
+                models.Task.assignedTo.is_not(None), models.Task.assignedTo != models.Task.owner_id,
+                models.Task.assignedTo != user_ids[0],
+            ).order_by(models.Task.id).limit(2)
+        )
+    finally:
+        db.close()
+    # As a long-running database would have
+    with database.engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return SimpleNamespace(
+        admin_email="admin@gmail.com", user_email=user_email, user_id=user_ids[0],
+        task_ids=task_ids, update_id=update_id, reassign_id=reassign_id,
+    )
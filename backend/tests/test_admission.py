@@ -0,0 +1,44 @@
+# Token buckets of the admission controller: the in-process ones and the
+# shared Redis ones (whose Lua script runs on fakeredis) must agree.
+# Run from backend/: python -m pytest tests
+import pytest
+
+from app import admission
+
+# Slow refill, so nothing comes back during a test
+RATE = 0.001
+
+def _local(monkeypatch):
+    return admission.LocalBuckets(max_keys=100)
+
+def _redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa") # fakeredis runs Lua scripts with it
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, url: fakeredis.FakeRedis(server=server)))
+    return admission.RedisBuckets("redis://test", "test")
+
+@pytest.fixture(params=[_local, _redis], ids=["local", "redis"])
+def buckets(request, monkeypatch):
+    buckets = request.param(monkeypatch)
+    yield buckets
+    # RedisBuckets lets requests through on errors; a broken script must fail the test instead
+    assert buckets.stats().get("errors", 0) == 0
+
+def test_bucket_admits_its_burst_then_waits(buckets):
+    limits = [("user:1", RATE, 2)]
+    assert buckets.take(limits) == [0.0]
+    assert buckets.take(limits) == [0.0]
+    (wait,) = buckets.take(limits)
+    assert wait == pytest.approx(1 / RATE, rel=0.01)
+
+def test_empty_bucket_takes_no_token_from_the_others(buckets):
+    user, route = ("user:1", RATE, 1), ("route:write", RATE, 2)
+    assert buckets.take([user, route]) == [0.0, 0.0]
+    # The user's bucket is empty: rejected, and the route's token is left alone
+    user_wait, route_wait = buckets.take([user, route])
+    assert user_wait > 0 and route_wait == 0
+    assert buckets.take([("user:2", RATE, 1), route]) == [0.0, 0.0]
+    assert buckets.take([("user:3", RATE, 1), route])[1] > 0
@@ -0,0 +1,236 @@
+# Query-plan and query-count regression checks for the CRUD read paths and
+# the main endpoints, against the `seeded` database (see conftest.py).
+#
+# 1. Each crud read runs with representative arguments; every statement it
+#    issues is EXPLAINed (EXPLAIN QUERY PLAN on SQLite, EXPLAIN (FORMAT JSON)
+#    on Postgres). A full scan of a table fails unless the case allows it.
+# 2. Each request is counted in SQL statements, which must match
+#    EXPECTED_QUERIES exactly; list and bulk requests are also run at two
+#    sizes, which must issue the same number (an N+1 shows up as a difference).
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import auth, crud, database, models, schemas
+from app.main import app
+
+class StatementLog:
+    # Statements (with their DBAPI parameters) issued by the engine while active
+    def __init__(self, engine):
+        self.active = False
+        self.statements = []
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            with self._lock:
+                self.statements.append((statement, parameters))
+
+    def capture(self, fn):
+        self.statements, self.active = [], True
+        try:
+            fn()
+        finally:
+            self.active = False
+        return self.statements
+
+@pytest.fixture(scope="module")
+def log():
+    log = StatementLog(database.engine)
+    yield log
+    event.remove(database.engine, "before_cursor_execute", log._record)
+
+# --- Query plans ---
+
+def sqlite_scans(conn, statement, parameters):
+    """
+    Tables read by a full scan: SQLite reports "SCAN <table>" without
+    "USING [COVERING] INDEX" for those. Scans of subquery results and FTS
+    virtual-table lookups don't count.
+    """
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    details = [row[-1] for row in plan]
+    scans = set()
+    for detail in details:
+        words = detail.split()
+        if words[0] == "SCAN" and words[1] in models.Base.metadata.tables and "USING" not in detail:
+            scans.add(words[1])
+    return scans, details
+
+def postgres_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, details = set(), []
+
+    def walk(node):
+        details.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+        if node["Node Type"] == "Seq Scan":
+            scans.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return scans, details
+
+NOW = datetime.utcnow()
+filters = schemas.TaskFilter
+# Listing tasks in id order reads the table in primary-key order and stops
+# at LIMIT, which SQLite also reports as SCAN
+ORDERED = {"tasks"}
+
+# name: (crud call taking (db, seeded), tables a full scan is acceptable on)
+PLAN_CASES = {
+    "get_user_by_email": (lambda db, s: crud.get_user_by_email(db, s.user_email), set()),
+    "get_user_by_id": (lambda db, s: crud.get_user_by_id(db, s.user_id), set()),
+    "search_users": (lambda db, s: crud.search_users(db, s.user_email[:3].upper(), limit=10), set()),
+    "get_task": (lambda db, s: crud.get_task(db, s.task_ids[100]), set()),
+    "get_tasks": (lambda db, s: crud.get_tasks(db, limit=100, rows=True), ORDERED),
+    "get_tasks after cursor": (lambda db, s: crud.get_tasks(db, limit=100, after_id=s.task_ids[100], rows=True), ORDERED),
+    "get_tasks status+due": (lambda db, s: crud.get_tasks(
+        db, limit=100, filters=filters(status="pending", due_after=NOW, due_before=NOW + timedelta(days=7)), rows=True), set()),
+    "get_tasks assignedTo": (lambda db, s: crud.get_tasks(db, limit=100, filters=filters(assignedTo=s.user_id), rows=True), set()),
+    "get_tasks q": (lambda db, s: crud.get_tasks(db, limit=100, filters=filters(q="invoice"), rows=True), set()),
+    "get_user_tasks": (lambda db, s: crud.get_user_tasks(db, s.user_id, limit=100), set()),
+    # The non-admin read_tasks filter
+    "get_visible_tasks": (lambda db, s: crud.get_visible_tasks(db, s.user_id, limit=100, rows=True), set()),
+    "get_visible_tasks after cursor": (lambda db, s: crud.get_visible_tasks(
+        db, s.user_id, limit=100, after_id=s.task_ids[100], rows=True), set()),
+    "get_visible_tasks include_archived": (lambda db, s: crud.get_visible_tasks(
+        db, s.user_id, limit=100, rows=True, include_archived=True), set()),
+    "get_tasks_by_ids": (lambda db, s: crud.get_tasks_by_ids(db, s.task_ids[100:102]), set()),
+    "get_task_changes": (lambda db, s: crud.get_task_changes(db, s.user_id, since_seq=1000, limit=100), set()),
+    "get_notifications": (lambda db, s: crud.get_notifications(db, s.user_id, limit=50), set()),
+    "get_assignee_trend": (lambda db, s: crud.get_assignee_trend(
+        db, s.user_id, (NOW - timedelta(days=30)).date(), NOW.date()), set()),
+}
+
+@pytest.mark.parametrize("name", PLAN_CASES)
+def test_query_plan(seeded, log, name):
+    fn, allowed = PLAN_CASES[name]
+    explain = postgres_scans if database.engine.dialect.name == "postgresql" else sqlite_scans
+    with database.SessionLocal() as db:
+        statements = log.capture(lambda: fn(db, seeded))
+    assert statements
+    with database.engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            scans, details = explain(conn, statement, parameters)
+            assert not scans - allowed, f"full scan of {', '.join(sorted(scans - allowed))}: {'; '.join(details)}\n{statement}"
+
+# --- Query counts ---
+
+# Statements per request with auth/response caches off. A change here is
+# either a regression or an intended change; update the number with it.
+EXPECTED_QUERIES = {
+    "GET /users/me/": 1,
+    "GET /users/": 2,
+    "GET /users/search": 2,
+    "GET /tasks/ (admin)": 2,
+    "GET /tasks/ (user)": 2,
+    "GET /tasks/ (user, filtered)": 2,
+    "GET /tasks/ (user, include_archived)": 2,
+    "GET /tasks/{id}": 2,
+    "GET /tasks/ (expand)": 3,
+    "GET /tasks/{id} (expand)": 3,
+    "GET /tasks/stats": 4,
+    "GET /tasks/changes": 3,
+    "GET /notifications/": 2,
+    "GET /reports/assignee-trend": 2,
+    "POST /tasks/": 7,
+    "PUT /tasks/{id}": 8,
+    "PUT /tasks/{id} (reassign)": 9, # + the previous assignee's visibility-loss tombstone
+    "DELETE /tasks/{id}": 8,
+    "POST /tasks/bulk": 12,
+}
+
+def _bearer(email):
+    return {"Authorization": "Bearer " + auth.create_access_token({"sub": email})}
+
+def _new_task(s):
+    return {"title": "check", "dueDate": datetime.utcnow().isoformat(), "assignedTo": s.user_id}
+
+# name: request (method, url, kwargs) built from the seeded data. Each one
+# touches its own tasks, so the cases don't depend on each other's order.
+REQUESTS = {
+    "GET /users/me/": lambda s: ("GET", "/users/me/", {"headers": _bearer(s.user_email)}),
+    "GET /users/": lambda s: ("GET", "/users/", {"headers": _bearer(s.admin_email)}),
+    "GET /users/search": lambda s: ("GET", "/users/search", {
+        "headers": _bearer(s.user_email), "params": {"prefix": s.user_email[:2]}}),
+    "GET /tasks/ (admin)": lambda s: ("GET", "/tasks/", {"headers": _bearer(s.admin_email), "params": {"limit": 100}}),
+    "GET /tasks/ (user)": lambda s: ("GET", "/tasks/", {"headers": _bearer(s.user_email), "params": {"limit": 100}}),
+    "GET /tasks/ (user, filtered)": lambda s: ("GET", "/tasks/", {
+        "headers": _bearer(s.user_email), "params": {"status": "pending", "q": "report"}}),
+    "GET /tasks/ (user, include_archived)": lambda s: ("GET", "/tasks/", {
+        "headers": _bearer(s.user_email), "params": {"include_archived": "true"}}),
+    "GET /tasks/{id}": lambda s: ("GET", f"/tasks/{s.task_ids[0]}", {"headers": _bearer(s.admin_email)}),
+    "GET /tasks/ (expand)": lambda s: ("GET", "/tasks/", {
+        "headers": _bearer(s.user_email), "params": {"expand": "owner,assignee"}}),
+    "GET /tasks/{id} (expand)": lambda s: ("GET", f"/tasks/{s.task_ids[0]}", {
+        "headers": _bearer(s.admin_email), "params": {"expand": "owner,assignee"}}),
+    "GET /tasks/stats": lambda s: ("GET", "/tasks/stats", {"headers": _bearer(s.user_email)}),
+    "GET /tasks/changes": lambda s: ("GET", "/tasks/changes", {"headers": _bearer(s.user_email)}),
+    "GET /notifications/": lambda s: ("GET", "/notifications/", {"headers": _bearer(s.user_email)}),
+    "GET /reports/assignee-trend": lambda s: ("GET", "/reports/assignee-trend", {"headers": _bearer(s.user_email)}),
+    "POST /tasks/": lambda s: ("POST", "/tasks/", {"headers": _bearer(s.user_email), "json": _new_task(s)}),
+    "PUT /tasks/{id}": lambda s: ("PUT", f"/tasks/{s.update_id}", {
+        "headers": _bearer(s.admin_email), "json": {"status": "completed"}}),
+    "PUT /tasks/{id} (reassign)": lambda s: ("PUT", f"/tasks/{s.reassign_id}", {
+        "headers": _bearer(s.admin_email), "json": {"status": "completed", "assignedTo": s.user_id}}),
+    "DELETE /tasks/{id}": lambda s: ("DELETE", f"/tasks/{s.task_ids[2]}", {"headers": _bearer(s.admin_email)}),
+    "POST /tasks/bulk": lambda s: ("POST", "/tasks/bulk", {"headers": _bearer(s.admin_email), "json": {
+        "create": [_new_task(s)] * 3,
+        "update": [{"id": task_id, "priority": "high"} for task_id in s.task_ids[3:6]],
+        "delete": s.task_ids[6:9],
+    }}),
+}
+
+# name: the same request at two sizes, which must issue the same number of statements
+SCALING = {
+    "GET /tasks/ limit 10 vs 500": lambda s: [
+        ("GET", "/tasks/", {"headers": _bearer(s.admin_email), "params": {"limit": limit}}) for limit in (10, 500)
+    ],
+    "GET /tasks/?expand=owner,assignee limit 10 vs 500": lambda s: [
+        ("GET", "/tasks/", {"headers": _bearer(s.admin_email), "params": {"limit": limit, "expand": "owner,assignee"}})
+        for limit in (10, 500)
+    ],
+    "POST /tasks/bulk 2 vs 40 items": lambda s: [
+        ("POST", "/tasks/bulk", {"headers": _bearer(s.admin_email), "json": {
+            "create": [_new_task(s)] * n,
+            "update": [{"id": task_id, "status": "in-progress"} for task_id in s.task_ids[start:start + n]],
+            "delete": s.task_ids[start + n:start + 2 * n],
+        }}) for n, start in ((2, 20), (40, 100))
+    ],
+}
+
+@pytest.fixture(scope="module")
+def client(seeded):
+    with TestClient(app) as client:
+        yield client
+
+def _count(client, log, method, url, **kwargs):
+    response = None
+
+    def send():
+        nonlocal response
+        response = client.request(method, url, **kwargs)
+
+    statements = log.capture(send)
+    assert response.status_code < 400, f"{method} {url} -> {response.status_code}: {response.text[:200]}"
+    return len(statements)
+
+@pytest.mark.parametrize("name", REQUESTS)
+def test_query_count(seeded, client, log, name):
+    method, url, kwargs = REQUESTS[name](seeded)
+    assert _count(client, log, method, url, **kwargs) == EXPECTED_QUERIES[name]
+
+@pytest.mark.parametrize("name", SCALING)
+def test_query_count_does_not_grow(seeded, client, log, name):
+    counts = [_count(client, log, method, url, **kwargs) for method, url, kwargs in SCALING[name](seeded)]
+    assert len(set(counts)) == 1, counts
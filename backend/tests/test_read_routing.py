@@ -0,0 +1,55 @@
+# Read-your-writes with a read replica: the marker cookie travels with the
+# client, so it works whichever worker serves the read.
+# Run from backend/: python -m pytest tests
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app import database
+
+@pytest.fixture
+def replica(monkeypatch):
+    replica_engine = create_engine("sqlite://")
+
+    class Healthy:
+        def usable(self):
+            return True
+
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    monkeypatch.setattr(database, "replica", Healthy())
+    return replica_engine
+
+@pytest.fixture
+def client(replica):
+    app = FastAPI()
+
+    @app.get("/read")
+    def read(request: Request):
+        with database.read_session(request) as db:
+            db.get_bind() # The engine is chosen on first use
+            return {"replica": database.is_replica_session(db)}
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    @app.post("/fail")
+    def fail():
+        raise ValueError("not a write")
+
+    app.add_middleware(database.ReadAfterWriteMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+def test_reads_follow_the_write_marker(client):
+    assert client.get("/read").json() == {"replica": True}
+    assert database.READ_PRIMARY_COOKIE not in client.cookies
+
+    response = client.post("/write")
+    assert database.READ_PRIMARY_COOKIE in response.cookies
+    # The same client, on any worker, now reads from the primary
+    assert client.get("/read").json() == {"replica": False}
+
+def test_failed_writes_set_no_marker(client):
+    assert database.READ_PRIMARY_COOKIE not in client.post("/fail").cookies
+    assert client.get("/read").json() == {"replica": True}
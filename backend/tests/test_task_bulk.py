@@ -0,0 +1,41 @@
+# POST /tasks/bulk when a task changes between authorization and the write.
+# Run from backend/: python -m pytest tests
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, database, models, schemas
+from app.main import app
+
+@pytest.fixture(scope="module")
+def client():
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    crud.create_user(db, schemas.UserCreate(email="bulk-admin@example.com", password="pw", is_admin=True))
+    db.close()
+    with TestClient(app) as client:
+        yield client
+
+def test_update_of_task_deleted_meanwhile_is_reported_not_found(client, monkeypatch):
+    token = client.post("/token", data={"username": "bulk-admin@example.com", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    gone_id, kept_id = [
+        client.post("/tasks/", headers=headers, json={"title": title, "dueDate": "2030-01-01T00:00:00"}).json()["id"]
+        for title in ("Deleted meanwhile", "Kept")
+    ]
+
+    # Another request deletes the task after the bulk request authorized its update
+    apply = crud.bulk_apply_tasks
+
+    def delete_then_apply(db, **kwargs):
+        crud.delete_task(db, gone_id)
+        return apply(db, **kwargs)
+
+    monkeypatch.setattr(crud, "bulk_apply_tasks", delete_then_apply)
+    response = client.post("/tasks/bulk", headers=headers, json={"update": [
+        {"id": gone_id, "priority": "high"}, {"id": kept_id, "priority": "high"},
+    ]})
+
+    assert response.status_code == 200, response.text
+    gone, kept = response.json()["results"]
+    assert (gone["status_code"], gone["task"]) == (404, None)
+    assert (kept["status_code"], kept["task"]["priority"]) == (200, "high")
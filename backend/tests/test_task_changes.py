@@ -0,0 +1,128 @@
+# Delta sync (GET /tasks/changes) when a task is reassigned.
+# Run from backend/: python -m pytest tests
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app import crud, database, models, schemas
+from app.main import app
+
+@pytest.fixture(scope="module")
+def client():
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    for email, is_admin in [("admin@example.com", True), ("owner@example.com", False),
+                            ("u@example.com", False), ("v@example.com", False)]:
+        crud.create_user(db, schemas.UserCreate(email=email, password="pw", is_admin=is_admin))
+    db.close()
+    with TestClient(app) as client:
+        yield client
+
+def _headers(client, email):
+    token = client.post("/token", data={"username": email, "password": "pw"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def _user_id(client, headers):
+    return client.get("/users/me/", headers=headers).json()["id"]
+
+def _cursor(client, headers):
+    changes = client.get("/tasks/changes", headers=headers).json()
+    while changes["has_more"]:
+        changes = client.get("/tasks/changes", params={"since": changes["cursor"]}, headers=headers).json()
+    return changes["cursor"]
+
+def _changes(client, headers, cursor):
+    return client.get("/tasks/changes", params={"since": cursor}, headers=headers).json()
+
+def _create_task(client, headers, assignee):
+    response = client.post("/tasks/", headers=headers, json={
+        "title": "Reassigned", "dueDate": "2030-01-01T00:00:00", "assignedTo": assignee,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+@pytest.mark.parametrize("via_bulk", [False, True])
+def test_reassignment_reaches_previous_assignee_as_deleted(client, via_bulk):
+    owner, admin = _headers(client, "owner@example.com"), _headers(client, "admin@example.com")
+    u, v = _headers(client, "u@example.com"), _headers(client, "v@example.com")
+    u_id, v_id = _user_id(client, u), _user_id(client, v)
+    task_id = _create_task(client, owner, v_id)
+    cursors = {name: _cursor(client, headers) for name, headers in
+               [("owner", owner), ("admin", admin), ("u", u), ("v", v)]}
+
+    # Only admins may reassign
+    if via_bulk:
+        response = client.post("/tasks/bulk", headers=admin, json={"update": [{"id": task_id, "assignedTo": u_id}]})
+        assert response.json()["results"][0]["status_code"] == 200, response.text
+    else:
+        response = client.put(f"/tasks/{task_id}", headers=admin, json={"assignedTo": u_id})
+        assert response.status_code == 200, response.text
+
+    v_changes = _changes(client, v, cursors["v"])
+    assert v_changes["deleted"] == [task_id]
+    assert v_changes["tasks"] == []
+
+    u_changes = _changes(client, u, cursors["u"])
+    assert [task["id"] for task in u_changes["tasks"]] == [task_id]
+    assert u_changes["deleted"] == []
+    # Owner and admin still see the task: an update, not a deletion
+    for name, headers in [("owner", owner), ("admin", admin)]:
+        changes = _changes(client, headers, cursors[name])
+        assert [task["id"] for task in changes["tasks"]] == [task_id]
+        assert changes["deleted"] == []
+
+def test_task_assigned_back_is_not_reported_deleted(client):
+    owner, admin = _headers(client, "owner@example.com"), _headers(client, "admin@example.com")
+    u, v = _headers(client, "u@example.com"), _headers(client, "v@example.com")
+    u_id, v_id = _user_id(client, u), _user_id(client, v)
+    task_id = _create_task(client, owner, v_id)
+    cursor = _cursor(client, v)
+
+    for assignee in (u_id, v_id):
+        assert client.put(f"/tasks/{task_id}", headers=admin, json={"assignedTo": assignee}).status_code == 200
+
+    changes = _changes(client, v, cursor)
+    assert [task["id"] for task in changes["tasks"]] == [task_id]
+    assert changes["deleted"] == []
+
+def test_change_committed_with_an_older_timestamp_is_delivered(client):
+    # A transaction that took its updated_at before another one but committed
+    # after it must still reach clients whose cursor is past the other one
+    owner, admin = _headers(client, "owner@example.com"), _headers(client, "admin@example.com")
+    late_id = _create_task(client, owner, None)
+    cursor = _cursor(client, admin)
+
+    db = database.SessionLocal()
+    try:
+        late = crud.get_task(db, late_id)
+        crud.update_task(db, late, {"title": "Committed late"})
+        db.execute(update(models.Task).where(models.Task.id == late_id).values(updated_at=datetime(2000, 1, 1)))
+        db.commit()
+    finally:
+        db.close()
+
+    changes = _changes(client, admin, cursor)
+    assert [(task["id"], task["title"]) for task in changes["tasks"]] == [(late_id, "Committed late")]
+
+def test_archived_task_is_reported_deleted_and_still_counted(client):
+    owner, u = _headers(client, "owner@example.com"), _headers(client, "u@example.com")
+    task_id = _create_task(client, owner, _user_id(client, u))
+    assert client.put(f"/tasks/{task_id}", headers=owner, json={"status": "completed"}).status_code == 200
+    cursor = _cursor(client, u)
+    completed = client.get("/tasks/stats", headers=u).json()["by_status"]["completed"]
+
+    db = database.SessionLocal()
+    try:
+        archived = []
+        while moved := crud.archive_completed_tasks(db, datetime.utcnow() + timedelta(days=1)):
+            archived += [row.id for row in moved]
+    finally:
+        db.close()
+    assert task_id in archived
+
+    changes = _changes(client, u, cursor)
+    assert changes["deleted"] == [task_id]
+    assert changes["tasks"] == []
+    assert client.get("/tasks/stats", headers=u).json()["by_status"]["completed"] == completed
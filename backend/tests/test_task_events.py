@@ -0,0 +1,33 @@
+# Visibility of task change events for each subscriber.
+import asyncio
+from datetime import datetime
+
+from app import events, schemas
+
+OWNER, OLD_ASSIGNEE, NEW_ASSIGNEE, OTHER = 1, 2, 3, 4
+
+def _task(assignee):
+    now = datetime(2030, 1, 1)
+    return schemas.Task(
+        id=7, title="New title", description="Secret plan", status="pending", priority="high",
+        assignedTo=assignee, dueDate=now, owner_id=OWNER, created_at=now, updated_at=now,
+    )
+
+async def _received(user_id, is_admin, event):
+    broker = events.InProcessBroker()
+    subscription = broker.subscribe(user_id, is_admin)
+    broker.publish(event)
+    return await subscription.get(timeout=0.1)
+
+def test_previous_assignee_only_learns_the_task_id():
+    event = events.task_event("updated", _task(NEW_ASSIGNEE), previous_assignee=OLD_ASSIGNEE)
+    assert asyncio.run(_received(OLD_ASSIGNEE, False, event)) == {"type": "task.removed", "task": {"id": 7}}
+
+def test_owner_assignee_and_admins_get_the_full_event():
+    event = events.task_event("updated", _task(NEW_ASSIGNEE), previous_assignee=OLD_ASSIGNEE)
+    for user_id, is_admin in [(OWNER, False), (NEW_ASSIGNEE, False), (OTHER, True)]:
+        assert asyncio.run(_received(user_id, is_admin, event)) == event
+
+def test_unrelated_users_get_nothing():
+    event = events.task_event("updated", _task(NEW_ASSIGNEE), previous_assignee=OLD_ASSIGNEE)
+    assert asyncio.run(_received(OTHER, False, event)) is None
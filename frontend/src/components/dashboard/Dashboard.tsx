@@ -1,30 +1,30 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { CheckSquare, Users, Clock, TrendingUp } from 'lucide-react';
 import { useApp } from '../../contexts/AppContext';
 import { useAuth } from '../../contexts/AuthContext';
 import { StatsCard } from './StatsCard';
 import { TaskChart } from './TaskChart';
+import { fetchTaskStats } from '../../services/api';
 
 export const Dashboard: React.FC = () => {
   const { tasks, users, clients } = useApp();
   const { user } = useAuth();
 
-  const taskStats = {
-    total: tasks.length,
-    completed: tasks.filter(t => t.status === 'completed').length,
-    pending: tasks.filter(t => t.status === 'pending').length,
-    inProgress: tasks.filter(t => t.status === 'in-progress').length,
-  };
+  const [displayStats, setDisplayStats] = useState({ total: 0, completed: 0, pending: 0, inProgress: 0 });
 
-  const userTasks = tasks.filter(t => t.assignedTo === user?.id);
-  const userTaskStats = {
-    total: userTasks.length,
-    completed: userTasks.filter(t => t.status === 'completed').length,
-    pending: userTasks.filter(t => t.status === 'pending').length,
-    inProgress: userTasks.filter(t => t.status === 'in-progress').length,
-  };
+  // Counts are aggregated server-side (GET /tasks/stats), scoped to what the current user can see
+  useEffect(() => {
+    fetchTaskStats()
+      .then((stats) => setDisplayStats({
+        total: stats.total,
+        completed: stats.by_status['completed'] || 0,
+        pending: stats.by_status['pending'] || 0,
+        inProgress: stats.by_status['in-progress'] || 0,
+      }))
+      .catch((error) => console.error('Failed to fetch task stats:', error));
+  }, [user?.id]);
 
-  const displayStats = user?.role === 'admin' ? taskStats : userTaskStats;
+  const userTasks = tasks.filter(t => t.assignedTo === user?.id);
 
   return (
     <div className="space-y-6">
@@ -1,8 +1,9 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { BarChart3, Download, Calendar, TrendingUp, Users, CheckSquare } from 'lucide-react';
 import { useApp } from '../../contexts/AppContext';
 import { useAuth } from '../../contexts/AuthContext';
 import { Button } from '../common/Button';
+import { fetchAssigneeTrend, fetchStatusTrend, fetchTaskStats } from '../../services/api';
 
 export const Reports: React.FC = () => {
   const { tasks, users, clients } = useApp();
@@ -10,17 +11,49 @@ export const Reports: React.FC = () => {
   const [selectedMonth, setSelectedMonth] = useState(new Date().getMonth());
   const [selectedYear, setSelectedYear] = useState(new Date().getFullYear());
 
-  const monthlyTasks = tasks.filter(task => {
-    const taskDate = new Date(task.createdAt);
-    return taskDate.getMonth() === selectedMonth && taskDate.getFullYear() === selectedYear;
-  });
+  const [monthlyStats, setMonthlyStats] = useState({ total: 0, completed: 0, pending: 0, inProgress: 0 });
+  const [priorityStats, setPriorityStats] = useState({ low: 0, medium: 0, high: 0, urgent: 0 });
+  const [throughput, setThroughput] = useState<{ completed: number; avgCycleHours: number | null }>({ completed: 0, avgCycleHours: null });
 
-  const monthlyStats = {
-    total: monthlyTasks.length,
-    completed: monthlyTasks.filter(t => t.status === 'completed').length,
-    pending: monthlyTasks.filter(t => t.status === 'pending').length,
-    inProgress: monthlyTasks.filter(t => t.status === 'in-progress').length,
-  };
+  // Monthly status/priority counts come from GET /tasks/stats for the selected month
+  useEffect(() => {
+    fetchTaskStats({
+      created_after: new Date(selectedYear, selectedMonth, 1).toISOString(),
+      created_before: new Date(selectedYear, selectedMonth + 1, 1).toISOString(),
+    })
+      .then((stats) => {
+        setMonthlyStats({
+          total: stats.total,
+          completed: stats.by_status['completed'] || 0,
+          pending: stats.by_status['pending'] || 0,
+          inProgress: stats.by_status['in-progress'] || 0,
+        });
+        setPriorityStats({
+          low: stats.by_priority['low'] || 0,
+          medium: stats.by_priority['medium'] || 0,
+          high: stats.by_priority['high'] || 0,
+          urgent: stats.by_priority['urgent'] || 0,
+        });
+      })
+      .catch((error) => console.error('Failed to fetch task stats:', error));
+  }, [selectedMonth, selectedYear]);
+
+  // Tasks completed in the selected month and their average cycle time, from the history rollups.
+  // Admins see everyone's; other users see the tasks completed while assigned to them.
+  useEffect(() => {
+    const pad = (n: number) => String(n).padStart(2, '0');
+    const params = {
+      start: `${selectedYear}-${pad(selectedMonth + 1)}-01`,
+      end: `${selectedYear}-${pad(selectedMonth + 1)}-${pad(new Date(selectedYear, selectedMonth + 1, 0).getDate())}`,
+      bucket: 'month' as const,
+    };
+    (user?.role === 'admin' ? fetchStatusTrend(params) : fetchAssigneeTrend(params))
+      .then((points) => {
+        const point = points[0];
+        setThroughput({ completed: point?.completed || 0, avgCycleHours: point?.avg_cycle_hours ?? null });
+      })
+      .catch((error) => console.error('Failed to fetch throughput:', error));
+  }, [selectedMonth, selectedYear, user?.role]);
 
   const userTaskStats = users.map(u => ({
     user: u,
@@ -30,13 +63,6 @@ export const Reports: React.FC = () => {
     inProgress: tasks.filter(t => t.assignedTo === u.id && t.status === 'in-progress').length,
   }));
 
-  const priorityStats = {
-    low: monthlyTasks.filter(t => t.priority === 'low').length,
-    medium: monthlyTasks.filter(t => t.priority === 'medium').length,
-    high: monthlyTasks.filter(t => t.priority === 'high').length,
-    urgent: monthlyTasks.filter(t => t.priority === 'urgent').length,
-  };
-
   const months = [
     'January', 'February', 'March', 'April', 'May', 'June',
     'July', 'August', 'September', 'October', 'November', 'December'
@@ -47,6 +73,7 @@ export const Reports: React.FC = () => {
       month: months[selectedMonth],
       year: selectedYear,
       stats: monthlyStats,
+      throughput,
       userStats: userTaskStats,
       priorityStats,
     };
@@ -140,6 +167,23 @@ export const Reports: React.FC = () => {
           </div>
         </div>
 
+        <div className="grid grid-cols-1 md:grid-cols-2 gap-6 mb-8">
+          <div className="p-4 bg-gray-50 rounded-lg border border-gray-200">
+            <p className="text-sm font-medium text-gray-600">Completed This Month</p>
+            <p className="text-2xl font-bold text-gray-900">{throughput.completed}</p>
+          </div>
+          <div className="p-4 bg-gray-50 rounded-lg border border-gray-200">
+            <p className="text-sm font-medium text-gray-600">Average Cycle Time</p>
+            <p className="text-2xl font-bold text-gray-900">
+              {throughput.avgCycleHours === null
+                ? '—'
+                : throughput.avgCycleHours >= 48
+                  ? `${(throughput.avgCycleHours / 24).toFixed(1)} days`
+                  : `${throughput.avgCycleHours.toFixed(1)} hours`}
+            </p>
+          </div>
+        </div>
+
         <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
           <div className="bg-gray-50 p-6 rounded-lg">
             <h3 className="text-lg font-semibold text-gray-900 mb-4">Priority Distribution</h3>
@@ -1,9 +1,9 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Calendar, User, Tag, AlertCircle } from 'lucide-react';
-import { useApp } from '../../contexts/AppContext';
 import { useAuth } from '../../contexts/AuthContext';
 import { Button } from '../common/Button';
 import { Task } from '../../types';
+import { searchUsers, UserSummary } from '../../services/api';
 
 interface TaskFormProps {
   onSubmit: (task: Omit<Task, 'id' | 'createdAt'>) => void;
@@ -11,7 +11,6 @@ interface TaskFormProps {
 }
 
 export const TaskForm: React.FC<TaskFormProps> = ({ onSubmit, onClose }) => {
-  const { users } = useApp();
   const { user } = useAuth();
   const [formData, setFormData] = useState({
     title: '',
@@ -22,6 +21,26 @@ export const TaskForm: React.FC<TaskFormProps> = ({ onSubmit, onClose }) => {
     reminderSet: '',
     tags: '',
   });
+  const [assigneeQuery, setAssigneeQuery] = useState('');
+  const [suggestions, setSuggestions] = useState<UserSummary[]>([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+
+  // Assignee typeahead: a small ranked page from GET /users/search instead of the full user list
+  useEffect(() => {
+    if (!showSuggestions) return;
+    const timer = setTimeout(() => {
+      searchUsers(assigneeQuery)
+        .then((found) => setSuggestions(found.filter(u => String(u.id) !== user?.id)))
+        .catch((error) => console.error('Failed to search users:', error));
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [assigneeQuery, showSuggestions, user?.id]);
+
+  const selectAssignee = (assignee: UserSummary) => {
+    setFormData({ ...formData, assignedTo: String(assignee.id) });
+    setAssigneeQuery(assignee.email);
+    setShowSuggestions(false);
+  };
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
@@ -40,8 +59,6 @@ export const TaskForm: React.FC<TaskFormProps> = ({ onSubmit, onClose }) => {
     });
   };
 
-  const availableUsers = users.filter(u => u.id !== user?.id);
-
   return (
     <form onSubmit={handleSubmit} className="space-y-6">
       <div>
@@ -89,24 +106,42 @@ export const TaskForm: React.FC<TaskFormProps> = ({ onSubmit, onClose }) => {
           </select>
         </div>
 
-        <div>
+        <div className="relative">
           <label className="block text-sm font-medium text-gray-700 mb-2">
             <User className="w-4 h-4 inline mr-1" />
             Assign To
           </label>
-          <select
-            value={formData.assignedTo}
-            onChange={(e) => setFormData({ ...formData, assignedTo: e.target.value })}
+          <input
+            type="text"
+            value={assigneeQuery}
+            onChange={(e) => {
+              setAssigneeQuery(e.target.value);
+              setFormData({ ...formData, assignedTo: '' });
+              setShowSuggestions(true);
+            }}
+            onFocus={() => setShowSuggestions(true)}
+            onBlur={() => setTimeout(() => setShowSuggestions(false), 150)}
             className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500"
+            placeholder="Search by email"
+            autoComplete="off"
             required
-          >
-            <option value="">Select user</option>
-            {availableUsers.map((user) => (
-              <option key={user.id} value={user.id}>
-                {user.name}
-              </option>
-            ))}
-          </select>
+          />
+          {showSuggestions && suggestions.length > 0 && (
+            <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-lg shadow-lg max-h-60 overflow-y-auto">
+              {suggestions.map((assignee) => (
+                <li key={assignee.id}>
+                  <button
+                    type="button"
+                    onMouseDown={(e) => e.preventDefault()}
+                    onClick={() => selectAssignee(assignee)}
+                    className="w-full text-left px-4 py-2 text-sm text-gray-700 hover:bg-gray-50"
+                  >
+                    {assignee.email}
+                  </button>
+                </li>
+              ))}
+            </ul>
+          )}
         </div>
       </div>
 
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Search, Filter, Plus } from 'lucide-react';
 import { useApp } from '../../contexts/AppContext';
 import { useAuth } from '../../contexts/AuthContext';
@@ -7,29 +7,93 @@ import { TaskForm } from './TaskForm';
 import { Modal } from '../common/Modal';
 import { Button } from '../common/Button';
 import { Task } from '../../types';
+import { createTask, fetchTasksPage, TaskQuery } from '../../services/api';
+
+const PAGE_SIZE = 30;
+
+// Map a backend task (schemas.Task) to the frontend Task shape
+const toTask = (t: any): Task => ({
+  id: String(t.id),
+  title: t.title,
+  description: t.description || '',
+  priority: t.priority,
+  status: t.status,
+  assignedTo: t.assignedTo != null ? String(t.assignedTo) : '',
+  assignedBy: String(t.owner_id),
+  createdAt: new Date(t.created_at),
+  dueDate: new Date(t.dueDate),
+});
 
 export const TaskList: React.FC = () => {
-  const { tasks, addTask, addNotification } = useApp();
+  const { addNotification } = useApp();
   const { user } = useAuth();
   const [isCreateModalOpen, setIsCreateModalOpen] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState<string>('all');
   const [priorityFilter, setPriorityFilter] = useState<string>('all');
+  const [tasks, setTasks] = useState<Task[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
+  const [isLoading, setIsLoading] = useState(false);
+  const [reloadKey, setReloadKey] = useState(0);
 
-  const filteredTasks = tasks.filter(task => {
-    const matchesSearch = task.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         task.description.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesStatus = statusFilter === 'all' || task.status === statusFilter;
-    const matchesPriority = priorityFilter === 'all' || task.priority === priorityFilter;
-    
-    // Show all tasks for admin, only assigned tasks for regular users
-    const matchesUser = user?.role === 'admin' || task.assignedTo === user?.id;
-    
-    return matchesSearch && matchesStatus && matchesPriority && matchesUser;
+  // Filtering, search and visibility (admins see all tasks, users the ones they
+  // created or are assigned) happen on the server, one keyset page at a time
+  const query = (after?: string): TaskQuery => ({
+    limit: PAGE_SIZE,
+    after,
+    status: statusFilter === 'all' ? undefined : statusFilter,
+    priority: priorityFilter === 'all' ? undefined : priorityFilter,
+    q: searchTerm.trim() || undefined,
   });
 
-  const handleCreateTask = (taskData: Omit<Task, 'id' | 'createdAt'>) => {
-    addTask(taskData);
+  useEffect(() => {
+    let cancelled = false;
+    // Debounced so typing in the search box doesn't fire a request per key
+    const timer = setTimeout(() => {
+      setIsLoading(true);
+      fetchTasksPage(query())
+        .then((page) => {
+          if (cancelled) return;
+          setTasks(page.tasks.map(toTask));
+          setNextCursor(page.nextCursor);
+        })
+        .catch((error) => console.error('Failed to fetch tasks:', error))
+        .finally(() => !cancelled && setIsLoading(false));
+    }, 300);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm, statusFilter, priorityFilter, reloadKey]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoading(true);
+    try {
+      const page = await fetchTasksPage(query(nextCursor));
+      setTasks(prev => [...prev, ...page.tasks.map(toTask)]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to fetch tasks:', error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const handleCreateTask = async (taskData: Omit<Task, 'id' | 'createdAt'>) => {
+    try {
+      await createTask({
+        title: taskData.title,
+        description: taskData.description,
+        priority: taskData.priority,
+        status: taskData.status,
+        assignedTo: Number(taskData.assignedTo),
+        dueDate: taskData.dueDate.toISOString(),
+      });
+    } catch (error) {
+      console.error('Failed to create task:', error);
+      return;
+    }
     addNotification({
       type: 'task_assigned',
       title: 'New Task Assigned',
@@ -39,6 +103,7 @@ export const TaskList: React.FC = () => {
       isRead: false,
     });
     setIsCreateModalOpen(false);
+    setReloadKey(key => key + 1); // Back to the first page, which now includes the new task
   };
 
   const handleEditTask = (task: Task) => {
@@ -105,7 +170,7 @@ export const TaskList: React.FC = () => {
         </div>
 
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-          {filteredTasks.map((task) => (
+          {tasks.map((task) => (
             <TaskCard
               key={task.id}
               task={task}
@@ -115,7 +180,15 @@ export const TaskList: React.FC = () => {
           ))}
         </div>
 
-        {filteredTasks.length === 0 && (
+        {nextCursor && (
+          <div className="text-center mt-6">
+            <Button variant="secondary" onClick={loadMore} loading={isLoading}>
+              Load more
+            </Button>
+          </div>
+        )}
+
+        {tasks.length === 0 && !isLoading && (
           <div className="text-center py-12">
             <p className="text-gray-500">No tasks found matching your criteria.</p>
           </div>
@@ -5,6 +5,8 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends the backend's read-after-write cookie back, so reads right after a save see it
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -39,6 +41,17 @@ export const fetchUsers = async () => {
   return response.data;
 };
 
+export interface UserSummary {
+  id: number;
+  email: string;
+}
+
+// Assignee typeahead: users whose email starts with `prefix`, best matches first (any signed-in user)
+export const searchUsers = async (prefix: string, limit = 10): Promise<UserSummary[]> => {
+  const response = await api.get('/users/search', { params: { prefix, limit } });
+  return response.data;
+};
+
 export const fetchUserById = async (userId: string) => {
   const response = await api.get(`/users/${userId}`);
   return response.data;
@@ -65,6 +78,53 @@ export const fetchTasks = async () => {
   return response.data;
 };
 
+export interface TaskQuery {
+  limit?: number;
+  after?: string;
+  status?: string;
+  priority?: string;
+  assignedTo?: number;
+  due_after?: string;
+  due_before?: string;
+  q?: string; // Full-text search over title and description
+  fields?: string; // Comma-separated task fields to return, e.g. 'id,status,priority,assignedTo'
+  include_archived?: boolean; // Also return completed tasks moved to the archive tier
+  expand?: string; // 'owner,assignee' embeds { id, email } of the related users
+}
+
+export const fetchTasksPage = async (params: TaskQuery = {}) => {
+  const response = await api.get('/tasks/', { params });
+  // Opaque keyset cursor for the next page; absent on the last page
+  return { tasks: response.data, nextCursor: response.headers['x-next-cursor'] as string | undefined };
+};
+
+export const fetchTaskChanges = async (since?: string, limit = 100) => {
+  const response = await api.get('/tasks/changes', { params: { since, limit } });
+  return response.data; // { tasks, deleted, cursor, has_more }
+};
+
+export const fetchTaskStats = async (params: { created_after?: string; created_before?: string } = {}) => {
+  const response = await api.get('/tasks/stats', { params });
+  return response.data; // { total, by_status, by_priority, by_assignee, by_month }
+};
+
+export interface TrendQuery {
+  start?: string; // YYYY-MM-DD
+  end?: string;
+  bucket?: 'day' | 'week' | 'month';
+}
+
+// Throughput and cycle time from the daily history rollups
+export const fetchStatusTrend = async (params: TrendQuery = {}) => {
+  const response = await api.get('/reports/status-trend', { params });
+  return response.data; // [{ period, entered, exited, completed, avg_cycle_hours }]
+};
+
+export const fetchAssigneeTrend = async (params: TrendQuery & { assignee_id?: number } = {}) => {
+  const response = await api.get('/reports/assignee-trend', { params });
+  return response.data; // [{ period, assigned, unassigned, completed, avg_cycle_hours }]
+};
+
 export const fetchTaskById = async (taskId: string) => {
   const response = await api.get(`/tasks/${taskId}`);
   return response.data;